@@ -126,11 +126,10 @@ async def handle_smart_wait(request: web.Request) -> web.Response:
 async def handle_wait_status(request: web.Request) -> web.Response:
     args = await _parse_body(request)
     wait_id = args.get("wait_id")
-    import time
     if wait_id:
         if wait_id in wait_engine.jobs:
             job = wait_engine.jobs[wait_id]
-            elapsed = time.time() - job.context.started_at
+            elapsed = job.context.elapsed
             return web.json_response({
                 "wait_id": job.id, "status": job.status,
                 "target": f"{job.target_type}:{job.target_id}",
@@ -174,7 +173,7 @@ async def handle_wait_status(request: web.Request) -> web.Response:
 
     jobs = []
     for job in wait_engine.jobs.values():
-        elapsed = time.time() - job.context.started_at
+        elapsed = job.context.elapsed
         jobs.append({
             "wait_id": job.id, "status": job.status,
             "target": f"{job.target_type}:{job.target_id}",
@@ -190,15 +189,14 @@ async def handle_wait_update(request: web.Request) -> web.Response:
         return web.json_response({"error": f"Wait job {wait_id} not found"}, status=404)
 
     job = wait_engine.jobs[wait_id]
-    import time
     if args.get("wake_when"):
         job.criteria = args["wake_when"]
     if args.get("timeout"):
         job.timeout = args["timeout"]
-        job.context.started_at = time.time()
+        job.context.restart()
     if args.get("message"):
         log.info(f"Wait update note for {wait_id}: {args['message']}")
-    job.next_check_at = 0
+    wait_engine.reschedule(wait_id)
 
     return web.json_response({
         "wait_id": wait_id, "status": "watching",
@@ -702,7 +700,7 @@ async def handle_api_task_item(request: web.Request) -> web.Response:
 async def handle_api_waits(request: web.Request) -> web.Response:
     jobs = []
     for job in wait_engine.jobs.values():
-        elapsed = time.time() - job.context.started_at
+        elapsed = job.context.elapsed
         jobs.append({
             "wait_id": job.id, "status": job.status,
             "target": f"{job.target_type}:{job.target_id}",
@@ -1055,7 +1053,7 @@ async def handle_video_record(request: web.Request) -> web.Response:
         if not window_id:
             return web.json_response({"error": "Window not found"}, status=404)
 
-    path = record_screen(duration=duration, fps=fps, window_id=window_id, display=display)
+    path = await record_screen(duration=duration, fps=fps, window_id=window_id, display=display)
     if path:
         size_mb = os.path.getsize(path) / 1024 / 1024
         return web.json_response({"ok": True, "path": path, "duration": duration, "fps": fps, "size_mb": round(size_mb, 2)})
@@ -1521,8 +1519,6 @@ async def storage_cleanup_loop():
 
 async def stuck_detection_loop():
     """Background loop that checks for stuck tasks and wakes OpenClaw."""
-    import subprocess
-
     debug.log("DAEMON", "Stuck detection loop started (checking every 60s)")
     while True:
         await asyncio.sleep(task_mgr.STUCK_CHECK_INTERVAL)
@@ -1537,12 +1533,19 @@ async def stuck_detection_loop():
                 msg = f"[task_stuck_resume] {json.dumps(packet, ensure_ascii=False)}"
                 debug.log_openclaw_event("stuck_alert", msg)
                 try:
-                    subprocess.run(
-                        [config.OPENCLAW_CLI, "system", "event", "--text", msg, "--mode", "now"],
-                        capture_output=True, text=True, timeout=10,
+                    proc = await asyncio.create_subprocess_exec(
+                        config.OPENCLAW_CLI, "system", "event", "--text", msg, "--mode", "now",
+                        stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL,
                     )
+                    try:
+                        async with asyncio.timeout(10):
+                            await proc.wait()
+                    except TimeoutError:
+                        proc.kill()
+                        await proc.wait()
+                        raise
                 except Exception as e:
-                    debug.log("ERROR", f"Failed to inject stuck alert: {e}")
+                    debug.log("ERROR", f"Failed to inject stuck alert: {e!r}")
         except Exception as e:
             debug.log("ERROR", f"Stuck detection error: {e}")
 
@@ -1559,6 +1562,8 @@ def main():
     app = create_app()
 
     async def on_startup(app):
+        # One DB connection for the daemon's lifetime; closed in on_cleanup.
+        db.enable_shared()
         if config.STUCK_DETECTION_ENABLED:
             app['stuck_detector'] = asyncio.create_task(stuck_detection_loop())
         else:
@@ -1595,6 +1600,11 @@ def main():
                 pass
         from .display.manager import cleanup_all
         cleanup_all()
+        # Stop wait timers/ticks first so nothing reopens the DB after close.
+        await wait_engine.shutdown()
+        from .wait_vision import close as close_vision
+        await close_vision()
+        await db.close_all()
 
     app.on_startup.append(on_startup)
     app.on_cleanup.append(on_cleanup)
@@ -1,10 +1,16 @@
 """SQLite database for tasks, plan items, actions, and wait jobs."""
+import asyncio
+import contextlib
 import aiosqlite
 import uuid
 from datetime import datetime, timezone
 
 from . import config
 
+# Bump whenever SCHEMA or the migrations in get_db() change; connections to a
+# DB already at this version skip schema setup entirely.
+SCHEMA_VERSION = 1
+
 SCHEMA = """
 CREATE TABLE IF NOT EXISTS tasks (
     id TEXT PRIMARY KEY,
@@ -72,28 +78,140 @@ CREATE TABLE IF NOT EXISTS wait_jobs (
 );
 
 CREATE INDEX IF NOT EXISTS idx_plan_items_task_id ON plan_items(task_id, ordinal);
-CREATE INDEX IF NOT EXISTS idx_actions_plan_item_id ON actions(plan_item_id);
-CREATE INDEX IF NOT EXISTS idx_actions_task_id ON actions(task_id);
-CREATE INDEX IF NOT EXISTS idx_action_logs_action_id ON action_logs(action_id);
+DROP INDEX IF EXISTS idx_actions_plan_item_id;
+DROP INDEX IF EXISTS idx_actions_task_id;
+DROP INDEX IF EXISTS idx_action_logs_action_id;
+CREATE INDEX IF NOT EXISTS idx_actions_plan_item_id_created_at ON actions(plan_item_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_actions_task_id_created_at ON actions(task_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_action_logs_action_id_created_at ON action_logs(action_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_tasks_status_updated_at ON tasks(status, updated_at);
 CREATE INDEX IF NOT EXISTS idx_task_messages_task_id_created_at ON task_messages(task_id, created_at);
 CREATE INDEX IF NOT EXISTS idx_wait_jobs_status ON wait_jobs(status);
 """
 
 
+# Process-wide connection used by the task manager (see shared_db()). Only
+# long-running processes opt in via enable_shared(): aiosqlite's worker thread
+# is non-daemon, so an open connection keeps the interpreter from exiting.
+_sharing = False
+_closed = False
+_shared: aiosqlite.Connection | None = None
+_shared_key: tuple | None = None
+_shared_lock: asyncio.Lock | None = None
+# Run whenever the shared connection is closed or re-pointed, so modules that
+# cache reads from it (task.manager) never serve another database's rows.
+_reset_hooks: list = []
+
+
+def on_reset(hook):
+    """Register a no-argument callback to run when the shared connection resets."""
+    _reset_hooks.append(hook)
+    return hook
+
+
+def _run_reset_hooks():
+    for hook in _reset_hooks:
+        hook()
+
+
 async def get_db() -> aiosqlite.Connection:
     config.ensure_data_dir()
-    db_conn = await aiosqlite.connect(str(config.DB_PATH))
+    # A "file:" DB_PATH is an SQLite URI (e.g. a shared in-memory DB in tests).
+    path = str(config.DB_PATH)
+    db_conn = await aiosqlite.connect(path, uri=path.startswith("file:"))
     db_conn.row_factory = aiosqlite.Row
-    await db_conn.executescript(SCHEMA)
-    # Migrations for columns added after initial schema
-    try:
-        await db_conn.execute("ALTER TABLE tasks ADD COLUMN agent_id TEXT")
+    async with db_conn.execute("PRAGMA user_version") as cur:
+        (version,) = await cur.fetchone()
+    if version < SCHEMA_VERSION:
+        await db_conn.executescript(SCHEMA)
+        # Migrations for columns added after initial schema
+        try:
+            await db_conn.execute("ALTER TABLE tasks ADD COLUMN agent_id TEXT")
+            await db_conn.commit()
+        except Exception:
+            pass  # column already exists
+        await db_conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         await db_conn.commit()
-    except Exception:
-        pass  # column already exists
     return db_conn
 
 
+def enable_shared():
+    """Make shared_db() keep one connection open for the life of the process.
+
+    The caller owns shutdown: it must await close_all() before exiting, after
+    stopping anything that could still query (see daemon on_cleanup).
+    """
+    global _sharing, _closed
+    _sharing = True
+    _closed = False
+
+
+@contextlib.asynccontextmanager
+async def shared_db():
+    """Yield a connection for the task manager.
+
+    With enable_shared(), this is the long-lived shared connection, opened on
+    first use. Callers are serialized so one caller's statements never land in
+    another's transaction, and anything left uncommitted is rolled back on
+    exit. Otherwise (scripts, one-shot tools) each call opens and closes its
+    own connection, so nothing outlives the caller.
+    """
+    global _shared, _shared_key, _shared_lock
+    if _closed:
+        raise RuntimeError("Shared DB connection is closed")
+    if not _sharing:
+        conn = await get_db()
+        try:
+            yield conn
+        finally:
+            await conn.close()
+        return
+    loop = asyncio.get_running_loop()
+    key = (str(config.DB_PATH), loop)
+    if _shared_key != key:
+        # First use, or DB path / event loop changed (tests) — start over.
+        if _shared is not None:
+            await _shared.close()
+        _shared = None
+        _shared_key = key
+        _shared_lock = asyncio.Lock()
+        _run_reset_hooks()
+    async with _shared_lock:
+        if _closed:  # close_all() ran while we waited for the lock
+            raise RuntimeError("Shared DB connection is closed")
+        if _shared is None:
+            _shared = await get_db()
+            await _shared.executescript(
+                "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL; PRAGMA busy_timeout=5000;"
+            )
+        try:
+            yield _shared
+        finally:
+            if _shared.in_transaction:
+                await _shared.rollback()
+
+
+async def close_all():
+    """Close the shared connection (daemon shutdown).
+
+    Waits for the current holder to finish; afterwards shared_db() refuses to
+    reopen until enable_shared() is called again.
+    """
+    global _shared, _shared_key, _shared_lock, _sharing, _closed
+    if _shared_lock is not None:
+        async with _shared_lock:
+            if _shared is not None:
+                await _shared.close()
+    elif _shared is not None:
+        await _shared.close()
+    _closed = _sharing
+    _sharing = False
+    _shared = None
+    _shared_key = None
+    _shared_lock = None
+    _run_reset_hooks()
+
+
 def new_id() -> str:
     return str(uuid.uuid4())[:8]
 
@@ -50,7 +50,7 @@ async def record_and_understand(
     # ── 1. Record ────────────────────────────────────────────────
     output_name = f"mavi_{task_id or 'tmp'}_{int(time.time())}.mp4"
     log.info(f"MAVI: recording {duration}s at {RECORD_FPS}fps → {output_name}")
-    path = record_screen(duration=duration, output_name=output_name, fps=RECORD_FPS)
+    path = await record_screen(duration=duration, output_name=output_name, fps=RECORD_FPS)
     if not path or not Path(path).exists():
         return {"error": "Screen recording failed — is ffmpeg installed and is the display running?"}
 
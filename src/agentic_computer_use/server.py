@@ -15,6 +15,28 @@ DAEMON_URL = os.environ.get("ACU_DAEMON_URL", "http://127.0.0.1:18790")
 
 app = Server("agentic-computer-use")
 
+# Connect/pool failures to a dead daemon surface fast; long reads
+# (video_record, gui_agent, desktop_look) keep the full 300s budget.
+_TIMEOUT = httpx.Timeout(300.0, connect=2.0, pool=5.0, write=10.0)
+
+# Persistent client — reused across tool calls to keep the daemon connection alive
+_client: httpx.AsyncClient | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(timeout=_TIMEOUT)
+    return _client
+
+
+async def close() -> None:
+    """Close the persistent daemon client, if one was created."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
 # ─── Tool definitions ───────────────────────────────────────────
 
 TOOLS = [
@@ -391,6 +413,24 @@ ROUTE_MAP = {
 }
 
 
+def _make_handler(method: str, path: str):
+    """Bind one route to a coroutine that returns the raw daemon response body."""
+    url = f"{DAEMON_URL}{path}"
+    if method == "GET":
+        async def handler(client: httpx.AsyncClient, arguments: dict) -> bytes:
+            async with client.stream("GET", url) as resp:
+                return await resp.aread()
+    else:
+        async def handler(client: httpx.AsyncClient, arguments: dict) -> bytes:
+            async with client.stream(method, url, json=arguments) as resp:
+                return await resp.aread()
+    return handler
+
+
+# Built once at import so call_tool does a single dict lookup per call.
+_DISPATCH = {name: _make_handler(method, path) for name, (method, path) in ROUTE_MAP.items()}
+
+
 # ─── Proxy handler ──────────────────────────────────────────────
 
 @app.list_tools()
@@ -400,35 +440,36 @@ async def list_tools():
 
 @app.call_tool()
 async def call_tool(name: str, arguments: dict):
-    if name not in ROUTE_MAP:
+    handler = _DISPATCH.get(name)
+    if handler is None:
         return [TextContent(type="text", text=json.dumps({"error": f"Unknown tool: {name}"}))]
 
-    method, path = ROUTE_MAP[name]
     try:
-        async with httpx.AsyncClient(timeout=300.0) as client:
-            if method == "GET":
-                resp = await client.get(f"{DAEMON_URL}{path}")
-            else:
-                resp = await client.post(f"{DAEMON_URL}{path}", json=arguments)
-
-            data = resp.json()
-            if "image_b64" in data:
-                isz = data.get("image_size", data.get("screen_size", {}))
-                sz = data.get("screen_size", {})
-                img_w, img_h = isz.get("width", "?"), isz.get("height", "?")
-                scr_w, scr_h = sz.get("width", "?"), sz.get("height", "?")
-                meta = (
-                    f"Screenshot: {img_w}×{img_h}px image (actual display: {scr_w}×{scr_h}px). "
-                    f"Specify x/y coordinates as pixel positions in this image "
-                    f"(0,0 = top-left corner, {img_w},{img_h} = bottom-right). "
-                    f"Coordinates are automatically scaled to screen space."
-                )
-                return [
-                    ImageContent(type="image", data=data["image_b64"], mimeType=data.get("mime_type", "image/jpeg")),
-                    TextContent(type="text", text=meta),
-                ]
-            return [TextContent(type="text", text=json.dumps(data))]
-    except httpx.ConnectError:
+        raw = await handler(_get_client(), arguments)
+
+        # Only image payloads need parsing — everything else is already JSON
+        # from the daemon and is proxied through as-is.
+        if b'"image_b64"' not in raw:
+            return [TextContent(type="text", text=raw.decode(errors="replace"))]
+
+        data = json.loads(raw)
+        if "image_b64" in data:
+            isz = data.get("image_size", data.get("screen_size", {}))
+            sz = data.get("screen_size", {})
+            img_w, img_h = isz.get("width", "?"), isz.get("height", "?")
+            scr_w, scr_h = sz.get("width", "?"), sz.get("height", "?")
+            meta = (
+                f"Screenshot: {img_w}×{img_h}px image (actual display: {scr_w}×{scr_h}px). "
+                f"Specify x/y coordinates as pixel positions in this image "
+                f"(0,0 = top-left corner, {img_w},{img_h} = bottom-right). "
+                f"Coordinates are automatically scaled to screen space."
+            )
+            return [
+                ImageContent(type="image", data=data["image_b64"], mimeType=data.get("mime_type", "image/jpeg")),
+                TextContent(type="text", text=meta),
+            ]
+        return [TextContent(type="text", text=json.dumps(data))]
+    except (httpx.ConnectError, httpx.ConnectTimeout):
         return [TextContent(type="text", text=json.dumps({
             "error": "DETM daemon is not running. Start it with: detm-daemon",
             "hint": "Run: detm-daemon  (or: python -m agentic_computer_use.daemon)"
@@ -443,8 +484,11 @@ def main():
 
 
 async def _run():
-    async with stdio_server() as (read_stream, write_stream):
-        await app.run(read_stream, write_stream, app.create_initialization_options())
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await app.run(read_stream, write_stream, app.create_initialization_options())
+    finally:
+        await close()
 
 
 if __name__ == "__main__":
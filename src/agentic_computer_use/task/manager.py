@@ -6,9 +6,11 @@ Tasks contain plan items (ordered checklist). Each plan item tracks
 actions (discrete operations) and their logs. This replaces the flat
 message thread with structured, drillable state.
 """
+import functools
 import json
 import time
 import logging
+from collections import OrderedDict
 from datetime import datetime, timezone
 
 from .. import db, debug, config
@@ -16,11 +18,15 @@ from ..display.manager import release_display
 
 log = logging.getLogger(__name__)
 
+# Compact JSON for every column this module writes (metadata, action input/output).
+_JSON_DUMPS = functools.partial(json.dumps, separators=(",", ":"), ensure_ascii=False)
+
 VALID_STATUSES = {"active", "paused", "completed", "failed", "cancelled"}
 TERMINAL_STATUSES = {"completed", "failed", "cancelled"}
 VALID_ITEM_STATUSES = {"pending", "active", "completed", "failed", "skipped", "scrapped"}
 VALID_MSG_TYPES = {"text", "lifecycle", "progress", "wait", "stuck", "plan"}
 VALID_WAIT_STATES = {"watching", "resolved", "timeout", "cancelled", "error"}
+_ITEM_SYMBOLS = {"completed": "✓", "failed": "✗", "skipped": "⊘", "scrapped": "⊗", "active": "▶", "pending": "○"}
 
 # Stuck detection config
 STUCK_THRESHOLD_SECONDS = 300
@@ -28,6 +34,20 @@ STUCK_CHECK_INTERVAL = 60
 STUCK_ALERT_COOLDOWN_SECONDS = 300
 STUCK_WAIT_FAILURES = 3
 
+# Short-lived LRU for the polled per-task reads (_get_task, get_thread), keyed
+# by (kind, task_id, ...). Entries live _READ_TTL seconds and are dropped per
+# task by _invalidate(task_id).
+_READ_TTL = 2.0
+_READ_CACHE_MAX = 512
+_READ_CACHE: OrderedDict[tuple, tuple[float, dict]] = OrderedDict()
+
+# list_tasks results keyed by (status, limit), as (expires_at, result). Writes
+# made through this process clear it; writes from other processes (scripts
+# calling the manager directly) show up once the entry's _READ_TTL runs out.
+# _write_gen stops a read that raced a write from storing a stale result.
+_LIST_CACHE: dict[tuple[str, int], tuple[float, dict]] = {}
+_write_gen = 0
+
 
 def _normalize_status(status: str | None) -> str | None:
     if status is None:
@@ -71,7 +91,52 @@ def _load_metadata(task: dict) -> dict:
 
 
 def _dump_metadata(meta: dict) -> str:
-    return json.dumps(meta, ensure_ascii=False)
+    return _JSON_DUMPS(meta)
+
+
+def _invalidate(task_id: str = None) -> None:
+    """Drop cached task reads after a write (all tasks if task_id is None)."""
+    global _write_gen
+    _write_gen += 1
+    _LIST_CACHE.clear()
+    if task_id is None:
+        _READ_CACHE.clear()
+        return
+    for key in [k for k in _READ_CACHE if k[1] == task_id]:
+        del _READ_CACHE[key]
+
+
+# Cached rows belong to one database; drop them when the shared connection is
+# closed or re-opened, or when DB_PATH changes before the next query does that.
+db.on_reset(_invalidate)
+_cache_db_path: str | None = None
+
+
+def _check_cache_db() -> None:
+    global _cache_db_path
+    path = str(config.DB_PATH)
+    if path != _cache_db_path:
+        _invalidate()
+        _cache_db_path = path
+
+
+def _cache_get(key: tuple):
+    _check_cache_db()
+    hit = _READ_CACHE.get(key)
+    if hit is None:
+        return None
+    if hit[0] < time.monotonic():
+        del _READ_CACHE[key]
+        return None
+    _READ_CACHE.move_to_end(key)
+    return hit[1]
+
+
+def _cache_put(key: tuple, value) -> None:
+    _READ_CACHE[key] = (time.monotonic() + _READ_TTL, value)
+    _READ_CACHE.move_to_end(key)
+    if len(_READ_CACHE) > _READ_CACHE_MAX:
+        _READ_CACHE.popitem(last=False)
 
 
 def _parse_iso(ts: str | None) -> float:
@@ -83,21 +148,30 @@ def _parse_iso(ts: str | None) -> float:
         return 0.0
 
 
+def _item_status_updates(item: dict, status: str, now: str) -> dict:
+    """Column changes for moving a plan item to *status* at *now*."""
+    updates = {"status": status}
+    if status == "active" and not item.get("started_at"):
+        updates["started_at"] = now
+    elif status in ("completed", "failed", "skipped", "scrapped"):
+        updates["completed_at"] = now
+        if item.get("started_at"):
+            duration = _parse_iso(now) - _parse_iso(item["started_at"])
+            updates["duration_seconds"] = round(duration, 1)
+    return updates
+
+
 # ─── Public API ──────────────────────────────────────────────────
 
 async def task_exists(task_id: str) -> bool:
-    conn = await db.get_db()
-    try:
+    async with db.shared_db() as conn:
         rows = await conn.execute_fetchall("SELECT 1 FROM tasks WHERE id = ? LIMIT 1", (task_id,))
         return bool(rows)
-    finally:
-        await conn.close()
 
 
 async def register_task(name: str, plan: list[str], metadata: dict = None, agent_id: str = None) -> dict:
     """Register a new task with plan items."""
-    conn = await db.get_db()
-    try:
+    async with db.shared_db() as conn:
         if not isinstance(plan, list) or not plan:
             return {"error": "Plan must be a non-empty array of step strings"}
 
@@ -118,40 +192,38 @@ async def register_task(name: str, plan: list[str], metadata: dict = None, agent
 
         await conn.execute(
             "INSERT INTO tasks (id, name, status, agent_id, metadata, created_at, updated_at) VALUES (?,?,?,?,?,?,?)",
-            (task_id, name, "active", agent_id or None, json.dumps(initial_meta), now, now)
+            (task_id, name, "active", agent_id or None, _JSON_DUMPS(initial_meta), now, now)
         )
 
         # Create plan items
-        items = []
-        for i, title in enumerate(plan):
-            item_id = db.new_id()
-            await conn.execute(
-                "INSERT INTO plan_items (id, task_id, ordinal, title, status) VALUES (?,?,?,?,?)",
-                (item_id, task_id, i, title, "pending")
-            )
-            items.append({"ordinal": i, "title": title, "status": "pending"})
+        await conn.executemany(
+            "INSERT INTO plan_items (id, task_id, ordinal, title, status) VALUES (?,?,?,?,?)",
+            [(db.new_id(), task_id, i, title, "pending") for i, title in enumerate(plan)]
+        )
+        items = [{"ordinal": i, "title": title, "status": "pending"} for i, title in enumerate(plan)]
 
         # Log registration
         await _append_msg(conn, task_id, "system",
-            f"Task registered: {name}\nPlan:\n" + "\n".join(f"  {i+1}. {s}" for i, s in enumerate(plan)),
+            f"Task registered: {name}\nPlan:\n" + "\n".join(f"  {i}. {s}" for i, s in enumerate(plan, 1)),
             "lifecycle", now)
         await conn.commit()
+        _invalidate(task_id)
 
         debug.log_task(task_id, "REGISTERED", f"{name} ({len(plan)} items)")
         return {"task_id": task_id, "name": name, "status": "active", "agent_id": agent_id or None, "items": items, "created_at": now}
-    finally:
-        await conn.close()
 
 
 async def update_task(task_id: str, message: str = None, query: str = None, status: str = None) -> dict:
     """Update task status or post a message."""
-    conn = await db.get_db()
-    try:
+    async with db.shared_db() as conn:
         task = await _get_task(conn, task_id)
         if not task:
             return {"error": f"Task {task_id} not found"}
 
         now = db.now_iso()
+        # Collected and written together below: one UPDATE tasks, one batch of messages.
+        task_updates = {}
+        msgs = []
 
         if status is not None:
             try:
@@ -160,8 +232,9 @@ async def update_task(task_id: str, message: str = None, query: str = None, stat
                 return {"error": str(e)}
             if normalized != task["status"]:
                 old = task["status"]
-                await conn.execute("UPDATE tasks SET status = ?, updated_at = ? WHERE id = ?", (normalized, now, task_id))
-                await _append_msg(conn, task_id, "system", f"Status changed: {old} → {normalized}", "lifecycle", now)
+                task_updates["status"] = normalized
+                task["status"] = normalized
+                msgs.append(("system", f"Status changed: {old} → {normalized}", "lifecycle"))
                 debug.log_task(task_id, f"STATUS {old} → {normalized}")
                 if normalized in TERMINAL_STATUSES:
                     try:
@@ -178,24 +251,30 @@ async def update_task(task_id: str, message: str = None, query: str = None, stat
                     "INSERT INTO actions (id, plan_item_id, task_id, action_type, summary, status, created_at) VALUES (?,?,?,?,?,?,?)",
                     (action_id, active_item["id"], task_id, "reasoning", message, "completed", now)
                 )
-            await _append_msg(conn, task_id, "agent", message, "text", now)
-            await conn.execute("UPDATE tasks SET updated_at = ? WHERE id = ?", (now, task_id))
+            msgs.append(("agent", message, "text"))
             debug.log_task(task_id, "MSG [agent]", message[:200])
 
+        if task_updates or msgs:
+            task_updates["updated_at"] = now
+            set_clause = ", ".join(f"{k} = ?" for k in task_updates)
+            await conn.execute(f"UPDATE tasks SET {set_clause} WHERE id = ?", (*task_updates.values(), task_id))
+        if msgs:
+            await conn.executemany(
+                "INSERT INTO task_messages (id, task_id, role, content, msg_type, created_at) VALUES (?,?,?,?,?,?)",
+                [(db.new_id(), task_id, role, content, msg_type, now) for role, content, msg_type in msgs]
+            )
         await conn.commit()
+        _invalidate(task_id)
 
         if query:
-            return await _query_task(conn, task_id, query)
+            return await _query_task(conn, task_id, query, task=task)
 
         return await _build_item_summary(conn, task_id)
-    finally:
-        await conn.close()
 
 
 async def update_plan_item(task_id: str, ordinal: int, status: str, note: str = None) -> dict:
     """Update a plan item's status."""
-    conn = await db.get_db()
-    try:
+    async with db.shared_db() as conn:
         task = await _get_task(conn, task_id)
         if not task:
             return {"error": f"Task {task_id} not found"}
@@ -212,15 +291,7 @@ async def update_plan_item(task_id: str, ordinal: int, status: str, note: str =
         if status not in VALID_ITEM_STATUSES:
             return {"error": f"Invalid item status: {status}"}
 
-        updates = {"status": status}
-        if status == "active" and not item.get("started_at"):
-            updates["started_at"] = now
-        elif status in ("completed", "failed", "skipped", "scrapped"):
-            updates["completed_at"] = now
-            if item.get("started_at"):
-                duration = _parse_iso(now) - _parse_iso(item["started_at"])
-                updates["duration_seconds"] = round(duration, 1)
-
+        updates = _item_status_updates(item, status, now)
         set_clause = ", ".join(f"{k} = ?" for k in updates)
         values = list(updates.values()) + [item["id"]]
         await conn.execute(f"UPDATE plan_items SET {set_clause} WHERE id = ?", values)
@@ -232,21 +303,65 @@ async def update_plan_item(task_id: str, ordinal: int, status: str, note: str =
                 (action_id, item["id"], task_id, "reasoning", note, "completed", now)
             )
 
-        symbol = {"completed": "✓", "failed": "✗", "skipped": "⊘", "scrapped": "⊗", "active": "▶", "pending": "○"}.get(status, "•")
+        symbol = _ITEM_SYMBOLS.get(status, "•")
         await _append_msg(conn, task_id, "system", f"{symbol} Item {ordinal}: {item['title']} → {status}", "progress", now)
         await conn.execute("UPDATE tasks SET updated_at = ? WHERE id = ?", (now, task_id))
         await conn.commit()
+        _invalidate(task_id)
 
         debug.log_task(task_id, f"ITEM {ordinal} → {status}", item["title"])
         return await _build_item_summary(conn, task_id)
-    finally:
-        await conn.close()
+
+
+async def update_plan_items(task_id: str, changes: list) -> dict:
+    """Apply several (ordinal, status) changes in order, in one transaction.
+
+    Same effect as calling update_plan_item for each pair (without notes).
+    Nothing is written if any ordinal or status is invalid.
+    """
+    async with db.shared_db() as conn:
+        task = await _get_task(conn, task_id)
+        if not task:
+            return {"error": f"Task {task_id} not found"}
+        if not changes:
+            return await _build_item_summary(conn, task_id)
+
+        rows = await conn.execute_fetchall("SELECT * FROM plan_items WHERE task_id = ?", (task_id,))
+        items = {row["ordinal"]: dict(row) for row in rows}
+        for ordinal, status in changes:
+            if ordinal not in items:
+                return {"error": f"Plan item {ordinal} not found"}
+            if status not in VALID_ITEM_STATUSES:
+                return {"error": f"Invalid item status: {status}"}
+
+        now = db.now_iso()
+        msgs = []
+        for ordinal, status in changes:
+            item = items[ordinal]
+            item.update(_item_status_updates(item, status, now))
+            symbol = _ITEM_SYMBOLS.get(status, "•")
+            msgs.append((db.new_id(), task_id, "system", f"{symbol} Item {ordinal}: {item['title']} → {status}", "progress", now))
+            debug.log_task(task_id, f"ITEM {ordinal} → {status}", item["title"])
+
+        # Later changes to the same item build on earlier ones, so write each
+        # touched item's final state once.
+        touched = [items[o] for o in dict.fromkeys(o for o, _ in changes)]
+        await conn.executemany(
+            "UPDATE plan_items SET status = ?, started_at = ?, completed_at = ?, duration_seconds = ? WHERE id = ?",
+            [(it["status"], it["started_at"], it["completed_at"], it["duration_seconds"], it["id"]) for it in touched]
+        )
+        await conn.executemany(
+            "INSERT INTO task_messages (id, task_id, role, content, msg_type, created_at) VALUES (?,?,?,?,?,?)", msgs
+        )
+        await conn.execute("UPDATE tasks SET updated_at = ? WHERE id = ?", (now, task_id))
+        await conn.commit()
+        _invalidate(task_id)
+        return await _build_item_summary(conn, task_id)
 
 
 async def append_plan_items(task_id: str, items: list, note: str = None) -> dict:
     """Append new plan items to an existing task's plan."""
-    conn = await db.get_db()
-    try:
+    async with db.shared_db() as conn:
         task = await _get_task(conn, task_id)
         if not task:
             return {"error": f"Task {task_id} not found"}
@@ -254,18 +369,14 @@ async def append_plan_items(task_id: str, items: list, note: str = None) -> dict
         rows = await conn.execute_fetchall(
             "SELECT MAX(ordinal) as max_ord FROM plan_items WHERE task_id = ?", (task_id,)
         )
-        next_ordinal = (dict(rows[0])["max_ord"] or -1) + 1
+        next_ordinal = (rows[0]["max_ord"] or -1) + 1
         now = db.now_iso()
 
-        new_items = []
-        for i, title in enumerate(items):
-            item_id = db.new_id()
-            ordinal = next_ordinal + i
-            await conn.execute(
-                "INSERT INTO plan_items (id, task_id, ordinal, title, status) VALUES (?,?,?,?,?)",
-                (item_id, task_id, ordinal, title, "pending")
-            )
-            new_items.append({"ordinal": ordinal, "title": title})
+        await conn.executemany(
+            "INSERT INTO plan_items (id, task_id, ordinal, title, status) VALUES (?,?,?,?,?)",
+            [(db.new_id(), task_id, next_ordinal + i, title, "pending") for i, title in enumerate(items)]
+        )
+        new_items = [{"ordinal": next_ordinal + i, "title": title} for i, title in enumerate(items)]
 
         msg = f"Plan updated: added {len(items)} item(s) — " + ", ".join(f'"{t}"' for t in items)
         if note:
@@ -273,11 +384,10 @@ async def append_plan_items(task_id: str, items: list, note: str = None) -> dict
         await _append_msg(conn, task_id, "system", msg, "plan", now)
         await conn.execute("UPDATE tasks SET updated_at = ? WHERE id = ?", (now, task_id))
         await conn.commit()
+        _invalidate(task_id)
 
         debug.log_task(task_id, "PLAN APPEND", f"+{len(items)} items")
         return {"ok": True, "added": new_items}
-    finally:
-        await conn.close()
 
 
 async def log_action(
@@ -290,8 +400,7 @@ async def log_action(
     ordinal: int = None,
 ) -> dict:
     """Log a discrete action under a plan item."""
-    conn = await db.get_db()
-    try:
+    async with db.shared_db() as conn:
         task = await _get_task(conn, task_id)
         if not task:
             return {"error": f"Task {task_id} not found"}
@@ -316,26 +425,21 @@ async def log_action(
 
         await conn.execute("UPDATE tasks SET updated_at = ? WHERE id = ?", (now, task_id))
         await conn.commit()
+        _invalidate(task_id)
 
         debug.log_task(task_id, f"ACTION [{action_type}]", summary[:200])
         return {"ok": True, "action_id": action_id, "plan_item_ordinal": item["ordinal"] if item else None}
-    finally:
-        await conn.close()
 
 
 async def get_task_summary(task_id: str, detail_level: str = "items") -> dict:
     """Get task summary at specified detail level."""
-    conn = await db.get_db()
-    try:
+    async with db.shared_db() as conn:
         return await _build_item_summary(conn, task_id, detail_level=detail_level)
-    finally:
-        await conn.close()
 
 
 async def get_task_detail(task_id: str, ordinal: int) -> dict:
     """Drill down into a specific plan item."""
-    conn = await db.get_db()
-    try:
+    async with db.shared_db() as conn:
         rows = await conn.execute_fetchall(
             "SELECT * FROM plan_items WHERE task_id = ? AND ordinal = ?", (task_id, ordinal)
         )
@@ -347,13 +451,11 @@ async def get_task_detail(task_id: str, ordinal: int) -> dict:
         action_rows = await conn.execute_fetchall(
             "SELECT * FROM actions WHERE plan_item_id = ? ORDER BY created_at", (item["id"],)
         )
+        logs = await _logs_by_action(conn, [ar["id"] for ar in action_rows])
         actions = []
         for ar in action_rows:
             a = dict(ar)
-            log_rows = await conn.execute_fetchall(
-                "SELECT * FROM action_logs WHERE action_id = ? ORDER BY created_at", (a["id"],)
-            )
-            a["logs"] = [dict(lr) for lr in log_rows]
+            a["logs"] = logs.get(a["id"], [])
             actions.append(a)
 
         return {
@@ -367,14 +469,16 @@ async def get_task_detail(task_id: str, ordinal: int) -> dict:
             "actions": actions,
             "action_count": len(actions),
         }
-    finally:
-        await conn.close()
 
 
 async def get_thread(task_id: str, limit: int = 50) -> dict:
     """Legacy chat thread view."""
-    conn = await db.get_db()
-    try:
+    key = ("thread", task_id, limit)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
+    async with db.shared_db() as conn:
         task = await _get_task(conn, task_id)
         if not task:
             return {"error": f"Task {task_id} not found"}
@@ -390,7 +494,7 @@ async def get_thread(task_id: str, limit: int = 50) -> dict:
         )
         item_list = [dict(i) for i in items]
 
-        return {
+        result = {
             "task_id": task_id,
             "name": task["name"],
             "status": task["status"],
@@ -398,13 +502,12 @@ async def get_thread(task_id: str, limit: int = 50) -> dict:
             "messages": messages,
             "message_count": len(messages),
         }
-    finally:
-        await conn.close()
+        _cache_put(key, result)
+        return result
 
 
 async def post_message(task_id: str, role: str, content: str, msg_type: str = "text") -> dict:
-    conn = await db.get_db()
-    try:
+    async with db.shared_db() as conn:
         task = await _get_task(conn, task_id)
         if not task:
             return {"error": f"Task {task_id} not found"}
@@ -412,15 +515,13 @@ async def post_message(task_id: str, role: str, content: str, msg_type: str = "t
         await _append_msg(conn, task_id, role, content, msg_type, now)
         await conn.execute("UPDATE tasks SET updated_at = ? WHERE id = ?", (now, task_id))
         await conn.commit()
+        _invalidate(task_id)
         return {"task_id": task_id, "role": role, "acknowledged": True}
-    finally:
-        await conn.close()
 
 
 async def on_wait_created(task_id: str, wait_id: str, target: str, criteria: str,
                           screenshot_refs: dict = None, timeout: int = None) -> dict:
-    conn = await db.get_db()
-    try:
+    async with db.shared_db() as conn:
         task = await _get_task(conn, task_id)
         if not task:
             return {"error": f"Task {task_id} not found"}
@@ -452,22 +553,20 @@ async def on_wait_created(task_id: str, wait_id: str, target: str, criteria: str
             await conn.execute(
                 "INSERT INTO actions (id, plan_item_id, task_id, action_type, summary, status, input_data, created_at) VALUES (?,?,?,?,?,?,?,?)",
                 (action_id, active_item["id"], task_id, "wait", f"Started wait {wait_id} on {target}: {criteria}",
-                 "started", json.dumps(input_data), now_iso)
+                 "started", _JSON_DUMPS(input_data), now_iso)
             )
 
         await _append_msg(conn, task_id, "system", f"[smart_wait] Started wait {wait_id} on {target}: {criteria}", "wait", now_iso)
         await conn.commit()
+        _invalidate(task_id)
 
         debug.log_task(task_id, "WAIT LINKED", f"{wait_id} ({target})")
         return {"ok": True, "task_id": task_id, "wait_id": wait_id}
-    finally:
-        await conn.close()
 
 
 async def on_wait_finished(task_id: str, wait_id: str, state: str, detail: str,
                            screenshot_refs: dict = None, elapsed_seconds: float = None) -> dict:
-    conn = await db.get_db()
-    try:
+    async with db.shared_db() as conn:
         task = await _get_task(conn, task_id)
         if not task:
             return {"error": f"Task {task_id} not found"}
@@ -501,28 +600,26 @@ async def on_wait_finished(task_id: str, wait_id: str, state: str, detail: str,
         action_status = "completed" if normalized_state == "resolved" else "failed"
         await conn.execute(
             "UPDATE actions SET output_data = ?, status = ? WHERE task_id = ? AND action_type = 'wait' AND summary LIKE ?",
-            (json.dumps(output_data), action_status, task_id, f"%{wait_id}%"),
+            (_JSON_DUMPS(output_data), action_status, task_id, f"%{wait_id}%"),
         )
 
         await _append_msg(conn, task_id, "system", f"[smart_wait] Wait {wait_id} {normalized_state}: {detail}", "wait", now_iso)
         await conn.commit()
+        _invalidate(task_id)
 
         debug.log_task(task_id, f"WAIT {normalized_state.upper()}", f"{wait_id}: {detail[:180]}")
         return {"ok": True, "task_id": task_id, "wait_id": wait_id, "state": normalized_state}
-    finally:
-        await conn.close()
 
 
 async def delete_task(task_id: str) -> dict:
     """Hard-delete a task and all its child records."""
-    conn = await db.get_db()
-    try:
+    async with db.shared_db() as conn:
         rows = await conn.execute_fetchall("SELECT 1 FROM tasks WHERE id = ?", (task_id,))
         if not rows:
             return {"error": f"Task {task_id} not found"}
         # Collect action IDs before deletion so we can clean up screenshot files
         action_rows = await conn.execute_fetchall("SELECT id FROM actions WHERE task_id = ?", (task_id,))
-        action_ids = [dict(r)["id"] for r in action_rows]
+        action_ids = [r["id"] for r in action_rows]
         # Delete child tables first (no FK cascade in SQLite by default)
         await conn.execute(
             "DELETE FROM action_logs WHERE action_id IN (SELECT id FROM actions WHERE task_id = ?)", (task_id,)
@@ -537,6 +634,7 @@ async def delete_task(task_id: str) -> dict:
             pass
         await conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
         await conn.commit()
+        _invalidate(task_id)
         try:
             release_display(task_id)
         except Exception:
@@ -565,34 +663,28 @@ async def delete_task(task_id: str) -> dict:
             pass
         debug.log_task(task_id, "DELETED", "hard delete")
         return {"ok": True, "task_id": task_id}
-    finally:
-        await conn.close()
 
 
 async def append_tool_log(task_id: str, log_type: str, content: str) -> None:
     """Append a tool-call log to the most recent action for this task (fire-and-forget)."""
-    conn = await db.get_db()
-    try:
+    async with db.shared_db() as conn:
         rows = await conn.execute_fetchall(
             "SELECT id FROM actions WHERE task_id = ? ORDER BY created_at DESC LIMIT 1",
             (task_id,)
         )
         if not rows:
             return
-        action_id = dict(rows[0])["id"]
+        action_id = rows[0]["id"]
         await conn.execute(
             "INSERT INTO action_logs (id, action_id, log_type, content, created_at) VALUES (?,?,?,?,?)",
             (db.new_id(), action_id, log_type, content, db.now_iso())
         )
         await conn.commit()
-    finally:
-        await conn.close()
 
 
 async def log_wait_verdict(task_id: str, wait_id: str, verdict: str, description: str) -> None:
     """Append a vision poll result to the wait action's logs."""
-    conn = await db.get_db()
-    try:
+    async with db.shared_db() as conn:
         rows = await conn.execute_fetchall(
             "SELECT id FROM actions WHERE task_id = ? AND action_type = 'wait' "
             "AND json_extract(input_data, '$.wait_id') = ?",
@@ -600,29 +692,25 @@ async def log_wait_verdict(task_id: str, wait_id: str, verdict: str, description
         )
         if not rows:
             return
-        action_id = dict(rows[0])["id"]
+        action_id = rows[0]["id"]
         await conn.execute(
             "INSERT INTO action_logs (id, action_id, log_type, content, created_at) VALUES (?,?,?,?,?)",
             (db.new_id(), action_id, "verdict", f"[{verdict}] {description}", db.now_iso())
         )
         await conn.commit()
-    finally:
-        await conn.close()
 
 
 async def set_task_display(task_id: str, display: str) -> None:
     """Persist the allocated display string into the task's metadata."""
-    conn = await db.get_db()
-    try:
+    async with db.shared_db() as conn:
         rows = await conn.execute_fetchall("SELECT metadata FROM tasks WHERE id = ?", (task_id,))
         if rows:
-            meta = _load_json(dict(rows[0]).get("metadata", "{}"), {})
+            meta = _load_json(rows[0]["metadata"], {})
             meta["display"] = display
             await conn.execute("UPDATE tasks SET metadata = ? WHERE id = ?",
-                               (json.dumps(meta), task_id))
+                               (_JSON_DUMPS(meta), task_id))
             await conn.commit()
-    finally:
-        await conn.close()
+            _invalidate(task_id)
 
 
 async def get_task_display(task_id: str) -> str | None:
@@ -633,24 +721,27 @@ async def get_task_display(task_id: str) -> str | None:
 
 async def get_task_display_info(task_id: str) -> tuple[str | None, bool]:
     """Return (display, isolated) from a task's metadata."""
-    conn = await db.get_db()
-    try:
+    async with db.shared_db() as conn:
         rows = await conn.execute_fetchall("SELECT metadata FROM tasks WHERE id = ?", (task_id,))
         if rows:
-            meta = _load_json(dict(rows[0]).get("metadata", "{}"), {})
+            meta = _load_json(rows[0]["metadata"], {})
             return meta.get("display"), bool(meta.get("isolated_display"))
         return None, False
-    finally:
-        await conn.close()
 
 
 async def list_tasks(status: str = "active", limit: int = 10) -> dict:
-    conn = await db.get_db()
-    try:
-        normalized = str(status or "active").strip().lower()
-        if normalized == "canceled":
-            normalized = "cancelled"
-
+    normalized = str(status or "active").strip().lower()
+    if normalized == "canceled":
+        normalized = "cancelled"
+
+    key = (normalized, limit)
+    _check_cache_db()
+    cached = _LIST_CACHE.get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+
+    gen = _write_gen
+    async with db.shared_db() as conn:
         if normalized == "all":
             rows = await conn.execute_fetchall("SELECT * FROM tasks ORDER BY updated_at DESC LIMIT ?", (limit,))
         else:
@@ -659,96 +750,116 @@ async def list_tasks(status: str = "active", limit: int = 10) -> dict:
                 (normalized, limit),
             )
 
+        # Plan items and action counts for every listed task in one query each
+        task_ids = [row["id"] for row in rows]
+        items_by_task = {tid: [] for tid in task_ids}
+        counts = {}
+        if task_ids:
+            placeholders = ",".join("?" * len(task_ids))
+            item_rows = await conn.execute_fetchall(
+                f"SELECT * FROM plan_items WHERE task_id IN ({placeholders}) ORDER BY ordinal", task_ids
+            )
+            for ir in item_rows:
+                items_by_task[ir["task_id"]].append(ir)
+            counts = await _action_counts(conn, task_ids)
+
         tasks = []
         for row in rows:
-            t = dict(row)
-            summary = await _build_item_summary(conn, t["id"])
-            tasks.append(summary)
-        return {"tasks": tasks}
-    finally:
-        await conn.close()
-
-
-async def build_resume_packet(task_id: str, reason: str | None = None, conn=None) -> dict:
-    owns_conn = conn is None
-    if owns_conn:
-        conn = await db.get_db()
-    try:
+            items = [_item_entry(ir, counts) for ir in items_by_task[row["id"]]]
+            tasks.append(_summary_from(dict(row), items))
+        result = {"tasks": tasks}
+        if gen == _write_gen:
+            _LIST_CACHE[key] = (time.monotonic() + _READ_TTL, result)
+        return result
+
+
+async def build_resume_packet(task_id: str, reason: str | None = None, conn=None,
+                              task: dict = None, meta: dict = None) -> dict:
+    """Resume context for a task. Callers holding the row (and its parsed
+    metadata) can pass them in to skip the re-read."""
+    if conn is None:
+        async with db.shared_db() as conn:
+            return await build_resume_packet(task_id, reason=reason, conn=conn, task=task, meta=meta)
+
+    if task is None:
         task = await _get_task(conn, task_id)
-        if not task:
-            return {"error": f"Task {task_id} not found"}
+    if not task:
+        return {"error": f"Task {task_id} not found"}
 
+    if meta is None:
         meta = _load_metadata(task)
-        items = await conn.execute_fetchall(
-            "SELECT ordinal, title, status FROM plan_items WHERE task_id = ? ORDER BY ordinal", (task_id,)
-        )
-        item_list = [dict(i) for i in items]
-        completed = [i for i in item_list if i["status"] == "completed"]
-        active = [i for i in item_list if i["status"] == "active"]
-        remaining = [i for i in item_list if i["status"] == "pending"]
-
-        recent_rows = await conn.execute_fetchall(
-            "SELECT role, content, msg_type, created_at FROM task_messages "
-            "WHERE task_id = ? ORDER BY created_at DESC LIMIT 5",
-            (task_id,),
-        )
-        recent_messages = [dict(m) for m in reversed(recent_rows)]
-
-        pct = round((len(completed) / len(item_list)) * 100) if item_list else 0
-        current = active[0] if active else (remaining[0] if remaining else None)
-
-        # Expand action details for the current (active/next pending) item
-        if current:
-            pi_rows = await conn.execute_fetchall(
-                "SELECT id FROM plan_items WHERE task_id = ? AND ordinal = ?",
-                (task_id, current["ordinal"]))
-            if pi_rows:
-                plan_item_id = dict(pi_rows[0])["id"]
-                action_rows = await conn.execute_fetchall(
-                    "SELECT * FROM actions WHERE plan_item_id = ? ORDER BY created_at",
-                    (plan_item_id,))
-                expanded_actions = []
-                for ar in action_rows:
-                    a = dict(ar)
-                    log_rows = await conn.execute_fetchall(
-                        "SELECT * FROM action_logs WHERE action_id = ? ORDER BY created_at",
-                        (a["id"],))
-                    a["logs"] = [dict(lr) for lr in log_rows]
-                    expanded_actions.append(a)
-                current["action_details"] = expanded_actions
+    items = await conn.execute_fetchall(
+        "SELECT ordinal, title, status FROM plan_items WHERE task_id = ? ORDER BY ordinal", (task_id,)
+    )
+    item_list = [dict(i) for i in items]
+    completed = [i for i in item_list if i["status"] == "completed"]
+    active = [i for i in item_list if i["status"] == "active"]
+    remaining = [i for i in item_list if i["status"] == "pending"]
 
-        return {
-            "task_id": task_id,
-            "name": task["name"],
-            "status": task["status"],
-            "agent_id": task.get("agent_id"),
-            "progress": {
-                "completed": [i["ordinal"] for i in completed],
-                "current": current["ordinal"] if current else None,
-                "current_name": current["title"] if current else None,
-                "remaining": [i["ordinal"] for i in remaining],
-                "pct": pct,
-            },
-            "items": item_list,
-            "recent_messages": recent_messages,
-            "wait": {
-                "active_wait_ids": meta.get("active_wait_ids", []),
-                "last_wait_state": meta.get("last_wait_state"),
-                "last_wait_event_at": meta.get("last_wait_event_at"),
-            },
-            "reason": reason or "task appears stuck",
-        }
-    finally:
-        if owns_conn:
-            await conn.close()
+    recent_rows = await conn.execute_fetchall(
+        "SELECT role, content, msg_type, created_at FROM task_messages "
+        "WHERE task_id = ? ORDER BY created_at DESC LIMIT 5",
+        (task_id,),
+    )
+    recent_messages = [dict(m) for m in reversed(recent_rows)]
+
+    pct = round((len(completed) / len(item_list)) * 100) if item_list else 0
+    current = active[0] if active else (remaining[0] if remaining else None)
+
+    # Expand action details for the current (active/next pending) item
+    if current:
+        pi_rows = await conn.execute_fetchall(
+            "SELECT id FROM plan_items WHERE task_id = ? AND ordinal = ?",
+            (task_id, current["ordinal"]))
+        if pi_rows:
+            plan_item_id = pi_rows[0]["id"]
+            action_rows = await conn.execute_fetchall(
+                "SELECT * FROM actions WHERE plan_item_id = ? ORDER BY created_at",
+                (plan_item_id,))
+            logs = await _logs_by_action(conn, [ar["id"] for ar in action_rows])
+            expanded_actions = []
+            for ar in action_rows:
+                a = dict(ar)
+                a["logs"] = logs.get(a["id"], [])
+                expanded_actions.append(a)
+            current["action_details"] = expanded_actions
+
+    return {
+        "task_id": task_id,
+        "name": task["name"],
+        "status": task["status"],
+        "agent_id": task.get("agent_id"),
+        "progress": {
+            "completed": [i["ordinal"] for i in completed],
+            "current": current["ordinal"] if current else None,
+            "current_name": current["title"] if current else None,
+            "remaining": [i["ordinal"] for i in remaining],
+            "pct": pct,
+        },
+        "items": item_list,
+        "recent_messages": recent_messages,
+        "wait": {
+            "active_wait_ids": meta.get("active_wait_ids", []),
+            "last_wait_state": meta.get("last_wait_state"),
+            "last_wait_event_at": meta.get("last_wait_event_at"),
+        },
+        "reason": reason or "task appears stuck",
+    }
 
 
 async def check_stuck_tasks() -> list[dict]:
-    conn = await db.get_db()
-    try:
-        rows = await conn.execute_fetchall("SELECT * FROM tasks WHERE status = 'active'")
+    async with db.shared_db() as conn:
+        # Only idle tasks are candidates; unparseable timestamps count as idle, as in _parse_iso.
+        rows = await conn.execute_fetchall(
+            "SELECT * FROM tasks WHERE status = 'active' AND ("
+            "(julianday('now') - julianday(updated_at)) * 86400 >= ? OR julianday(updated_at) IS NULL)",
+            (STUCK_THRESHOLD_SECONDS,),
+        )
         alerts = []
         now_epoch = time.time()
+        # Written in one batch after the scan: task_id -> metadata JSON, plus stuck messages
+        meta_updates = {}
+        msg_inserts = []
 
         for row in rows:
             task = dict(row)
@@ -758,8 +869,7 @@ async def check_stuck_tasks() -> list[dict]:
             active_wait_ids, reconciled = await _reconcile_active_wait_ids(conn, meta.get("active_wait_ids", []))
             if reconciled:
                 meta["active_wait_ids"] = active_wait_ids
-                await conn.execute("UPDATE tasks SET metadata = ? WHERE id = ?", (_dump_metadata(meta), task_id))
-                await conn.commit()
+                meta_updates[task_id] = _dump_metadata(meta)
 
             if active_wait_ids:
                 continue
@@ -774,7 +884,7 @@ async def check_stuck_tasks() -> list[dict]:
 
             reason = f"no updates for {idle_seconds/60:.0f} minutes and no active smart wait"
 
-            packet = await build_resume_packet(task_id, reason=reason, conn=conn)
+            packet = await build_resume_packet(task_id, reason=reason, conn=conn, task=task, meta=meta)
             alerts.append({
                 "task_id": task_id,
                 "name": task["name"],
@@ -784,14 +894,23 @@ async def check_stuck_tasks() -> list[dict]:
             })
 
             meta["last_stuck_alert_at"] = now_epoch
-            await conn.execute("UPDATE tasks SET metadata = ? WHERE id = ?", (_dump_metadata(meta), task_id))
-            await _append_msg(conn, task_id, "system", f"Task appears stuck: {reason}", "stuck", db.now_iso())
-            await conn.commit()
+            meta_updates[task_id] = _dump_metadata(meta)
+            msg_inserts.append((db.new_id(), task_id, "system", f"Task appears stuck: {reason}", "stuck", db.now_iso()))
             debug.log_task(task_id, "STUCK", reason)
 
+        if meta_updates:
+            await conn.executemany(
+                "UPDATE tasks SET metadata = ? WHERE id = ?",
+                [(m, tid) for tid, m in meta_updates.items()],
+            )
+            await conn.executemany(
+                "INSERT INTO task_messages (id, task_id, role, content, msg_type, created_at) VALUES (?,?,?,?,?,?)",
+                msg_inserts,
+            )
+            await conn.commit()
+            _invalidate()
+
         return alerts
-    finally:
-        await conn.close()
 
 
 # ─── Internal helpers ────────────────────────────────────────────
@@ -804,8 +923,17 @@ async def _append_msg(conn, task_id: str, role: str, content: str, msg_type: str
 
 
 async def _get_task(conn, task_id: str) -> dict | None:
+    # Callers may mutate the row, so hand out copies of the cached one.
+    key = ("task", task_id)
+    cached = _cache_get(key)
+    if cached is not None:
+        return dict(cached)
     rows = await conn.execute_fetchall("SELECT * FROM tasks WHERE id = ?", (task_id,))
-    return dict(rows[0]) if rows else None
+    if not rows:
+        return None
+    task = dict(rows[0])
+    _cache_put(key, task)
+    return dict(task)
 
 
 async def _get_active_plan_item(conn, task_id: str) -> dict | None:
@@ -835,30 +963,18 @@ async def _build_item_summary(conn, task_id: str, detail_level: str = "items") -
     focused_ordinal = None
     if detail_level == "focused":
         for ir in items_rows:
-            it = dict(ir)
-            if it["status"] == "active":
-                focused_ordinal = it["ordinal"]
+            if ir["status"] == "active":
+                focused_ordinal = ir["ordinal"]
         if focused_ordinal is None:
             for ir in items_rows:
-                it = dict(ir)
-                if it["status"] == "pending":
-                    focused_ordinal = it["ordinal"]
+                if ir["status"] == "pending":
+                    focused_ordinal = ir["ordinal"]
                     break
 
+    counts = await _action_counts(conn, [task_id])
     items = []
-    for ir in items_rows:
-        item = dict(ir)
-        entry = {
-            "ordinal": item["ordinal"],
-            "title": item["title"],
-            "status": item["status"],
-            "duration_s": item.get("duration_seconds"),
-        }
-
-        action_count_rows = await conn.execute_fetchall(
-            "SELECT COUNT(*) as cnt FROM actions WHERE plan_item_id = ?", (item["id"],)
-        )
-        entry["actions"] = dict(action_count_rows[0])["cnt"]
+    for item in items_rows:
+        entry = _item_entry(item, counts)
 
         expand_this = (
             detail_level in ("actions", "full")
@@ -869,9 +985,9 @@ async def _build_item_summary(conn, task_id: str, detail_level: str = "items") -
             action_rows = await conn.execute_fetchall(
                 "SELECT * FROM actions WHERE plan_item_id = ? ORDER BY created_at", (item["id"],)
             )
+            logs = await _logs_by_action(conn, [ar["id"] for ar in action_rows])
             entry["action_details"] = []
-            for ar in action_rows:
-                a = dict(ar)
+            for a in action_rows:
                 action_entry = {
                     "id": a["id"],
                     "action_type": a["action_type"],
@@ -879,22 +995,57 @@ async def _build_item_summary(conn, task_id: str, detail_level: str = "items") -
                     "status": a["status"],
                     "created_at": a["created_at"],
                 }
-                action_entry["input_data"] = a.get("input_data")
-                action_entry["output_data"] = a.get("output_data")
-                log_rows = await conn.execute_fetchall(
-                    "SELECT * FROM action_logs WHERE action_id = ? ORDER BY created_at", (a["id"],)
-                )
-                action_entry["logs"] = [dict(lr) for lr in log_rows]
+                action_entry["input_data"] = a["input_data"]
+                action_entry["output_data"] = a["output_data"]
+                action_entry["logs"] = logs.get(a["id"], [])
                 entry["action_details"].append(action_entry)
 
         items.append(entry)
 
+    return _summary_from(task, items)
+
+
+async def _logs_by_action(conn, action_ids: list[str]) -> dict[str, list[dict]]:
+    """Logs for several actions in one query, grouped by action id in time order."""
+    if not action_ids:
+        return {}
+    placeholders = ",".join("?" * len(action_ids))
+    rows = await conn.execute_fetchall(
+        f"SELECT * FROM action_logs WHERE action_id IN ({placeholders}) ORDER BY created_at", action_ids
+    )
+    logs = {}
+    for lr in rows:
+        logs.setdefault(lr["action_id"], []).append(dict(lr))
+    return logs
+
+
+async def _action_counts(conn, task_ids: list[str]) -> dict[str, int]:
+    """Action count per plan item id, for all items of the given tasks."""
+    placeholders = ",".join("?" * len(task_ids))
+    rows = await conn.execute_fetchall(
+        f"SELECT plan_item_id, COUNT(*) AS cnt FROM actions WHERE task_id IN ({placeholders}) GROUP BY plan_item_id",
+        task_ids,
+    )
+    return {r["plan_item_id"]: r["cnt"] for r in rows}
+
+
+def _item_entry(item, counts: dict[str, int]) -> dict:
+    return {
+        "ordinal": item["ordinal"],
+        "title": item["title"],
+        "status": item["status"],
+        "duration_s": item["duration_seconds"],
+        "actions": counts.get(item["id"], 0),
+    }
+
+
+def _summary_from(task: dict, items: list[dict]) -> dict:
     completed = [i for i in items if i["status"] == "completed"]
     total = len(items)
     pct = round((len(completed) / total) * 100) if total > 0 else 0
 
     return {
-        "task_id": task_id,
+        "task_id": task["id"],
         "name": task["name"],
         "status": task["status"],
         "agent_id": task.get("agent_id"),
@@ -905,8 +1056,9 @@ async def _build_item_summary(conn, task_id: str, detail_level: str = "items") -
     }
 
 
-async def _query_task(conn, task_id: str, query: str) -> dict:
-    task = await _get_task(conn, task_id)
+async def _query_task(conn, task_id: str, query: str, task: dict = None) -> dict:
+    if task is None:
+        task = await _get_task(conn, task_id)
     if not task:
         return {"error": f"Task {task_id} not found"}
 
@@ -946,7 +1098,7 @@ async def _reconcile_active_wait_ids(conn, active_wait_ids: list[str]) -> tuple[
         f"SELECT id FROM wait_jobs WHERE id IN ({placeholders}) AND status = 'watching'",
         tuple(ids),
     )
-    alive = {dict(r)["id"] for r in rows}
+    alive = {r["id"] for r in rows}
     filtered = [wid for wid in ids if wid in alive]
     changed = filtered != ids
     return filtered, changed
@@ -1,4 +1,5 @@
 """Screen recording via ffmpeg for video comprehension."""
+import asyncio
 import signal
 import subprocess
 import os
@@ -12,6 +13,23 @@ log = logging.getLogger(__name__)
 
 RECORDINGS_DIR = config.DATA_DIR / "recordings"
 
+# (display, window_id) -> (expires_at, (video_size, grab_offset)). Windows rarely
+# move between recordings, so this skips the xdotool spawn on repeat captures.
+_GEOM_TTL = 60.0
+_GEOM_CACHE: dict[tuple[str, int], tuple[float, tuple[str, str]]] = {}
+
+
+def _cached_geometry(display: str, window_id: int) -> tuple[str, str] | None:
+    hit = _GEOM_CACHE.get((display, window_id))
+    if hit and hit[0] > time.monotonic():
+        return hit[1]
+    return None
+
+
+def _store_geometry(display: str, window_id: int, geom: tuple[str, str]) -> tuple[str, str]:
+    _GEOM_CACHE[(display, window_id)] = (time.monotonic() + _GEOM_TTL, geom)
+    return geom
+
 
 def ensure_recordings_dir():
     RECORDINGS_DIR.mkdir(parents=True, exist_ok=True)
@@ -67,24 +85,60 @@ def _build_capture_args(window_id: int | None, fps: int, display: str = None) ->
     display = display or config.DISPLAY
     env = {**os.environ, "DISPLAY": display}
     if window_id:
+        cached = _cached_geometry(display, window_id)
+        if cached:
+            return cached
         try:
             result = subprocess.run(
                 ["xdotool", "getwindowgeometry", "--shell", str(window_id)],
                 capture_output=True, text=True, timeout=5, env=env,
             )
-            geom = {}
-            for line in result.stdout.split("\n"):
-                if "=" in line:
-                    k, v = line.split("=", 1)
-                    geom[k.strip()] = v.strip()
-            x, y = int(geom.get("X", 0)), int(geom.get("Y", 0))
-            w, h = int(geom.get("WIDTH", 1920)), int(geom.get("HEIGHT", 1080))
-            return f"{w}x{h}", f"+{x},{y}"
+            geom = _parse_window_geometry(result.stdout)
+            return _store_geometry(display, window_id, geom) if result.returncode == 0 else geom
+        except Exception:
+            pass
+    return _get_root_geometry(display), "+0,0"
+
+
+async def _build_capture_args_async(window_id: int | None, fps: int, display: str = None) -> tuple[str, str]:
+    """_build_capture_args without blocking the event loop on xdotool."""
+    display = display or config.DISPLAY
+    env = {**os.environ, "DISPLAY": display}
+    if window_id:
+        cached = _cached_geometry(display, window_id)
+        if cached:
+            return cached
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "xdotool", "getwindowgeometry", "--shell", str(window_id),
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL, env=env,
+            )
+            try:
+                async with asyncio.timeout(5):
+                    stdout, _ = await proc.communicate()
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                raise
+            geom = _parse_window_geometry(stdout.decode(errors="replace"))
+            return _store_geometry(display, window_id, geom) if proc.returncode == 0 else geom
         except Exception:
             pass
     return _get_root_geometry(display), "+0,0"
 
 
+def _parse_window_geometry(stdout: str) -> tuple[str, str]:
+    """Turn `xdotool getwindowgeometry --shell` output into (video_size, grab_offset)."""
+    geom = {}
+    for line in stdout.split("\n"):
+        if "=" in line:
+            k, v = line.split("=", 1)
+            geom[k.strip()] = v.strip()
+    x, y = int(geom.get("X", 0)), int(geom.get("Y", 0))
+    w, h = int(geom.get("WIDTH", 1920)), int(geom.get("HEIGHT", 1080))
+    return f"{w}x{h}", f"+{x},{y}"
+
+
 def start_recording(task_id: str, window_id: int | None = None, fps: int = 5, display: str = None) -> AsyncRecording:
     """Start an async ffmpeg recording (runs until stopped)."""
     display = display or config.DISPLAY
@@ -110,14 +164,14 @@ def start_recording(task_id: str, window_id: int | None = None, fps: int = 5, di
     return AsyncRecording(process=proc, output_path=output_path, task_id=task_id)
 
 
-def record_screen(
+async def record_screen(
     duration: int,
     output_name: str = None,
     fps: int = 5,
     window_id: int = None,
     display: str = None,
 ) -> str | None:
-    """Record the screen/window to an MP4 file.
+    """Record the screen/window to an MP4 file without blocking the event loop.
 
     Returns the output file path, or None on failure.
     """
@@ -127,7 +181,7 @@ def record_screen(
     output_path = str(RECORDINGS_DIR / output_name)
 
     env = {**os.environ, "DISPLAY": display}
-    video_size, grab_offset = _build_capture_args(window_id, fps, display=display)
+    video_size, grab_offset = await _build_capture_args_async(window_id, fps, display=display)
 
     cmd = [
         "ffmpeg", "-y",
@@ -143,24 +197,29 @@ def record_screen(
     ]
 
     try:
-        result = subprocess.run(
-            cmd, capture_output=True, text=True,
-            timeout=duration + 10, env=env
+        proc = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE, env=env
         )
-        if result.returncode == 0 and Path(output_path).exists():
-            size_mb = Path(output_path).stat().st_size / 1024 / 1024
-            log.info(f"Recorded {duration}s to {output_path} ({size_mb:.1f}MB)")
-            return output_path
-        else:
-            log.error(f"ffmpeg failed: {result.stderr[:500]}")
-            return None
-    except subprocess.TimeoutExpired:
-        log.error("Recording timed out")
-        return None
     except FileNotFoundError:
         log.error("ffmpeg not found")
         return None
 
+    try:
+        async with asyncio.timeout(duration + 10):
+            _, stderr = await proc.communicate()
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        log.error("Recording timed out")
+        return None
+
+    if proc.returncode == 0 and Path(output_path).exists():
+        size_mb = Path(output_path).stat().st_size / 1024 / 1024
+        log.info(f"Recorded {duration}s to {output_path} ({size_mb:.1f}MB)")
+        return output_path
+    log.error(f"ffmpeg failed: {stderr.decode(errors='replace')[:500]}")
+    return None
+
 
 def cleanup_old_recordings(max_age_hours: int = 24):
     """Delete recordings older than max_age_hours."""
@@ -3,10 +3,21 @@ import time
 
 
 class JobContext:
-    """Tracks start time for elapsed reporting in prompts."""
+    """Tracks start time for elapsed reporting in prompts.
+
+    started_at is on the monotonic clock so elapsed/timeout math survives wall
+    clock steps.
+    """
 
     def __init__(self):
-        self.started_at: float = time.time()
+        self.restart()
+
+    def restart(self):
+        self.started_at: float = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
 
 
 def build_prompt(criteria: str, elapsed: float) -> str:
@@ -1,9 +1,15 @@
 """Wait engine — async event loop managing all active wait jobs."""
 import asyncio
+import hashlib
+import json
 import logging
+import re
 import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
 
+import numpy as np
+
 from .. import config, debug, db
 from ..capture.screen import capture_window, capture_screen, find_window_by_name, frame_to_jpeg
 from ..wait_vision import evaluate_condition
@@ -12,8 +18,33 @@ from .context import JobContext, build_prompt
 
 log = logging.getLogger(__name__)
 
+# Scheduling clock — monotonic, so NTP/DST steps never stall or rush jobs.
+_now = time.monotonic
+
 # Fixed poll interval — no adaptive logic.
 POLL_INTERVAL = 1.0
+# How long a captured frame may be reused by other jobs on the same target.
+FRAME_CACHE_TTL = POLL_INTERVAL / 2
+
+# Verdicts for (criteria, frame digest) — an unchanged screen gets the same
+# answer without another vision call until config.MAX_STATIC_SECONDS pass.
+# LRU-bounded.
+VERDICT_CACHE_SIZE = 128
+
+# Structured verdict: FINAL_JSON: {...} through the end of the reply.
+_FINAL_JSON_RE = re.compile(r"FINAL_JSON:\s*(\{.*\})", re.DOTALL)
+# A line that opens with a YES verdict; group 1 is the evidence after it.
+_YES_LINE_RE = re.compile(r"^[ \t]*YES\b[: \t]*(.*)$", re.IGNORECASE | re.MULTILINE)
+# A verdict line sits near the top of a reply; never scan past this many chars.
+_VERDICT_SCAN_CHARS = 1024
+# Leading verdict word → state, and the detail used when the model gives none.
+_VERDICT_MAP = {"YES": "resolved", "NO": "watching"}
+_VERDICT_DEFAULTS = {"resolved": "Condition met", "watching": "Condition not yet met"}
+# Lines that merely echo the prompt's answer template ("YES: <one sentence of
+# visible evidence ...>") — dropped so an echoed template never resolves a wait.
+_TEMPLATE_LINE_RE = re.compile(
+    r"^.*<[^>\n]*(?:evidence|what is missing|what you see)[^>\n]*>.*$\n?", re.IGNORECASE | re.MULTILINE
+)
 
 # Per-display asyncio locks — serialize Xlib calls per display, not globally.
 # Jobs on different Xvfb displays run captures in parallel.
@@ -26,7 +57,52 @@ def _get_capture_lock(display: str) -> asyncio.Lock:
     return _CAPTURE_LOCKS[display]
 
 
-@dataclass
+# Window name → id lookups, shared across jobs. Misses are never cached so a
+# job keeps retrying until the window appears; hits expire so a re-created
+# window is picked up again.
+_WINDOW_TTL = 30.0
+_WINDOW_CACHE: dict[tuple[str, str], tuple[float, int]] = {}
+
+
+def _find_window(name: str, display: str | None) -> int | None:
+    """Cached find_window_by_name. Called via run_in_executor."""
+    key = (display or config.DISPLAY, name)
+    hit = _WINDOW_CACHE.get(key)
+    if hit and hit[0] > _now():
+        return hit[1]
+    wid = find_window_by_name(name, display=display)
+    if wid:
+        _WINDOW_CACHE[key] = (_now() + _WINDOW_TTL, wid)
+    return wid
+
+
+def _is_window_id(target_id: str) -> bool:
+    try:
+        int(target_id)
+        return True
+    except ValueError:
+        return False
+
+
+def _forget_window(name: str, display: str | None, wid: int) -> None:
+    """Drop a cached lookup whose window can no longer be captured."""
+    key = (display or config.DISPLAY, name)
+    hit = _WINDOW_CACHE.get(key)
+    if hit and hit[1] == wid:
+        del _WINDOW_CACHE[key]
+
+
+def _frame_key(job: "WaitJob") -> tuple[str, str, str]:
+    """Jobs sharing this key would capture identical pixels."""
+    return (job.display or config.DISPLAY, job.target_type, job.target_id)
+
+
+def _frame_digest(frame) -> bytes:
+    """Digest of the raw pixels — cheaper than a JPEG encode. Called via run_in_executor."""
+    return hashlib.blake2b(np.ascontiguousarray(frame), digest_size=16).digest()
+
+
+@dataclass(slots=True)
 class WaitJob:
     id: str
     target_type: str      # "window" | "pty" | "screen"
@@ -41,39 +117,108 @@ class WaitJob:
     context: JobContext = field(default_factory=JobContext)
     next_check_at: float = 0.0
     _resolved_window_id: int | None = None
-    _last_jpeg: bytes | None = None  # most recent frame, saved on resolve/timeout
+    _last_frame: np.ndarray | None = None  # most recent capture, saved on resolve/timeout
+    _last_jpeg: bytes | None = None  # its JPEG, once something has needed it
+    _handle: asyncio.TimerHandle | None = None  # pending call_later for the next check
 
 
 class WaitEngine:
-    """Manages all active wait jobs in a single async loop."""
+    """Manages all active wait jobs; each job re-arms its own loop timer."""
 
     def __init__(self):
         self.jobs: dict[str, WaitJob] = {}
-        self._task: asyncio.Task | None = None
-        self._wake_event = asyncio.Event()
+        # Jobs with an evaluation in flight, and strong refs to their tasks.
+        self._inflight: set[str] = set()
+        self._ticks: set[asyncio.Task] = set()
+        self._stopped = False
+        self._verdict_cache: OrderedDict[tuple[str, bytes], tuple[float, str, str]] = OrderedDict()
+        # Latest frame per capture target, shared by every job watching it.
+        self._frame_cache: dict[tuple[str, str, str], tuple[float, np.ndarray]] = {}
 
     def add_job(self, job: WaitJob):
         self.jobs[job.id] = job
         log.info(f"Added wait job {job.id}: target={job.target_type}:{job.target_id}, criteria={job.criteria!r}")
         debug.log_wait_event(job.id, "CREATED", f"target={job.target_type}:{job.target_id}, criteria={job.criteria!r}, timeout={job.timeout}s")
-        self._wake_event.set()
-        if self._task is None or self._task.done():
-            self._task = asyncio.create_task(self._run_loop())
-        else:
-            log.debug("Loop already running, new job will be picked up")
+        self._schedule(job, job.next_check_at)
 
     def get_job(self, job_id: str) -> WaitJob | None:
         return self.jobs.get(job_id)
 
+    def reschedule(self, job_id: str, at: float = 0.0) -> bool:
+        """Move a job's next check to *at* (default: immediately)."""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return False
+        self._schedule(job, at)
+        return True
+
+    def _schedule(self, job: WaitJob, at: float):
+        """Arm the job's timer so it is evaluated at *at* (on the _now() clock)."""
+        if job._handle is not None:
+            job._handle.cancel()
+        job.next_check_at = at
+        delay = max(0.0, at - _now())
+        job._handle = asyncio.get_running_loop().call_later(delay, self._fire, job.id)
+
+    def _fire(self, job_id: str):
+        job = self.jobs.get(job_id)
+        # An evaluation already in flight re-arms the timer when it finishes.
+        if job is None or job_id in self._inflight or self._stopped:
+            return
+        job._handle = None
+        self._inflight.add(job_id)
+        self._track(asyncio.create_task(self._tick(job)))
+
+    def _track(self, task: asyncio.Task):
+        """Hold a strong ref to a background task until it finishes."""
+        self._ticks.add(task)
+        task.add_done_callback(self._ticks.discard)
+
+    async def shutdown(self):
+        """Disarm every job timer and cancel in-flight evaluations (daemon cleanup).
+
+        Nothing touches the database after this returns, so the shared
+        connection can be closed safely.
+        """
+        self._stopped = True
+        for job in self.jobs.values():
+            if job._handle is not None:
+                job._handle.cancel()
+                job._handle = None
+        tasks = list(self._ticks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _tick(self, job: WaitJob):
+        try:
+            await self._evaluate_job(job)
+        except Exception as e:
+            log.error(f"Job {job.id}: tick failed: {e}")
+            if job.id in self.jobs:
+                self._schedule(job, _now() + POLL_INTERVAL)
+        finally:
+            self._inflight.discard(job.id)
+
     def cancel_job(self, job_id: str, reason: str = "cancelled") -> WaitJob | None:
         if job_id in self.jobs:
             job = self.jobs.pop(job_id)
+            if job._handle is not None:
+                job._handle.cancel()
+                job._handle = None
+            self._release_frame(job)
             job.status = "cancelled"
             job.result_message = reason
             log.info(f"Cancelled wait job {job_id}: {reason}")
             return job
         return None
 
+    def _release_frame(self, job: WaitJob):
+        """Drop the cached frame once no remaining job watches its target."""
+        key = _frame_key(job)
+        if not any(_frame_key(j) == key for j in self.jobs.values()):
+            self._frame_cache.pop(key, None)
+
     async def _persist_wait_terminal(self, job: WaitJob, state: str, result_message: str):
         """Persist final state to wait_jobs table."""
         conn = await db.get_db()
@@ -86,42 +231,13 @@ class WaitEngine:
         finally:
             await conn.close()
 
-    async def _run_loop(self):
-        if hasattr(self, '_loop_running') and self._loop_running:
-            log.debug("Loop already running, skipping duplicate start")
-            return
-        self._loop_running = True
-        log.info("Wait engine loop started")
-
-        while self.jobs:
-            now = time.time()
-
-            overdue = [j for j in list(self.jobs.values()) if j.next_check_at <= now]
-
-            if not overdue:
-                next_job = min(self.jobs.values(), key=lambda j: j.next_check_at)
-                wait_time = next_job.next_check_at - now
-                self._wake_event.clear()
-                try:
-                    await asyncio.wait_for(self._wake_event.wait(), timeout=wait_time)
-                except asyncio.TimeoutError:
-                    pass
-                continue
-
-            # Evaluate all overdue jobs concurrently.
-            # Vision calls run in parallel; frame captures are serialized per display.
-            await asyncio.gather(*[self._evaluate_job(j) for j in overdue])
-
-        self._loop_running = False
-        log.info("Wait engine loop ended (no active jobs)")
-
     async def _evaluate_job(self, job: WaitJob):
         """Evaluate a single wait job: capture → encode → vision → YES/NO verdict."""
-        # Guard: job may have been cancelled between overdue-list snapshot and now
+        # Guard: job may have been cancelled after its timer fired
         if job.id not in self.jobs:
             return
 
-        now = time.time()
+        now = _now()
         loop = asyncio.get_event_loop()
 
         # Check timeout
@@ -131,38 +247,66 @@ class WaitEngine:
             return
 
         # Capture frame — serialize per display (Xlib not thread-safe per connection)
-        display_key = job.display or config.DISPLAY
-        async with _get_capture_lock(display_key):
-            frame = await loop.run_in_executor(None, self._capture, job)
+        # Jobs on the same target within FRAME_CACHE_TTL share one grab; the
+        # cache is checked under the lock so a queued job sees a fresh frame.
+        key = _frame_key(job)
+        async with _get_capture_lock(key[0]):
+            cached = self._frame_cache.get(key)
+            if cached is not None and _now() - cached[0] < FRAME_CACHE_TTL:
+                frame = cached[1]
+            else:
+                frame = await loop.run_in_executor(None, self._capture, job)
+                if frame is not None:
+                    self._frame_cache[key] = (_now(), frame)
 
         if frame is None:
             log.warning(f"Job {job.id}: frame capture failed")
-            job.next_check_at = now + POLL_INTERVAL
+            self._schedule(job, now + POLL_INTERVAL)
             return
 
-        # Encode to JPEG off the main thread
-        jpeg = await loop.run_in_executor(None, frame_to_jpeg, frame)
-        job._last_jpeg = jpeg
+        # Digest the raw frame off the main thread; JPEG encoding waits until
+        # the vision model actually needs the image.
+        digest = await loop.run_in_executor(None, _frame_digest, frame)
+        job._last_frame = frame
+        job._last_jpeg = None
 
         # Vision evaluation — pure async I/O, runs concurrently with other jobs
         try:
-            prompt = build_prompt(job.criteria, elapsed)
-            response = await evaluate_condition(prompt, [jpeg], job_id=job.id)
-            verdict, desc = self._parse_verdict(response)
-            log.info(f"Job {job.id}: {verdict} — {desc}")
+            key = (job.criteria, digest)
+            cached = self._verdict_cache.get(key)
+            if cached is not None and cached[0] <= now:
+                # Stale: an unchanged screen still gets a fresh look every
+                # MAX_STATIC_SECONDS.
+                del self._verdict_cache[key]
+                cached = None
+            if cached is not None:
+                self._verdict_cache.move_to_end(key)
+                _, verdict, desc = cached
+            else:
+                jpeg = await loop.run_in_executor(None, frame_to_jpeg, frame)
+                job._last_jpeg = jpeg
+                prompt = build_prompt(job.criteria, elapsed)
+                response = await evaluate_condition(prompt, [jpeg], job_id=job.id)
+                verdict, desc = self._parse_verdict(response)
+                self._verdict_cache[key] = (_now() + config.MAX_STATIC_SECONDS, verdict, desc)
+                if len(self._verdict_cache) > VERDICT_CACHE_SIZE:
+                    self._verdict_cache.popitem(last=False)
+            log.info(f"Job {job.id}: {verdict} — {desc}{' (cached)' if cached else ''}")
             debug.log_wait_event(job.id, f"VERDICT: {verdict.upper()}", desc)
 
             if job.task_id:
-                asyncio.ensure_future(task_mgr.log_wait_verdict(job.task_id, job.id, verdict, desc))
+                self._track(asyncio.create_task(task_mgr.log_wait_verdict(job.task_id, job.id, verdict, desc)))
 
             if verdict == "resolved":
                 await self._resolve_job(job, desc)
             else:
-                job.next_check_at = time.time() + POLL_INTERVAL
+                # Pace from the tick's start, not its end: the vision call
+                # overlaps the poll interval instead of adding to it.
+                self._schedule(job, now + POLL_INTERVAL)
 
         except Exception as e:
             log.error(f"Job {job.id}: evaluation error: {e}")
-            job.next_check_at = time.time() + POLL_INTERVAL
+            self._schedule(job, _now() + POLL_INTERVAL)
 
     def _capture(self, job: WaitJob):
         """Capture frame based on target type. Called via run_in_executor."""
@@ -174,14 +318,20 @@ class WaitEngine:
                     wid = int(job.target_id)
                     job._resolved_window_id = wid
                 except ValueError:
-                    wid = find_window_by_name(job.target_id, display=job.display)
+                    wid = _find_window(job.target_id, job.display)
                     if wid:
                         job._resolved_window_id = wid
                         log.info(f"Job {job.id}: resolved window '{job.target_id}' → {wid}")
                     else:
                         log.warning(f"Job {job.id}: window '{job.target_id}' not found")
                         return None
-            return capture_window(job._resolved_window_id, display=job.display)
+            frame = capture_window(job._resolved_window_id, display=job.display)
+            if frame is None and not _is_window_id(job.target_id):
+                # The window found by name may have closed; look it up again
+                # next tick instead of retrying a dead id until timeout.
+                _forget_window(job.target_id, job.display, job._resolved_window_id)
+                job._resolved_window_id = None
+            return frame
         elif job.target_type == "pty":
             return capture_screen(display=job.display)
         return None
@@ -190,25 +340,33 @@ class WaitEngine:
         """Parse YES/NO verdict from model response.
 
         Supports three formats:
-        1. Starts with YES: → resolved immediately
+        1. Starts with YES: → resolved immediately (a one-line NO: → watching)
         2. Contains FINAL_JSON: {...} → parse decision/summary/evidence from JSON
         3. Multi-line with YES: on a later line → resolved with that line's detail
         """
-        text = (response or "").strip()
+        text = _TEMPLATE_LINE_RE.sub("", response or "").strip()
         if not text:
             return ("watching", "Empty response")
 
-        # 1. Direct YES at start
-        if text.upper().startswith("YES"):
-            detail = text[3:].lstrip(": ").strip()
-            return ("resolved", detail or "Condition met")
+        # 1. Verdict word up front — the usual one-line reply is decided by a
+        # dict lookup. A leading NO only settles it when nothing follows, since
+        # a later line may still carry FINAL_JSON or a YES.
+        word = text.split(None, 1)[0].split(":", 1)[0].upper()
+        verdict = _VERDICT_MAP.get(word)
+        if verdict == "resolved" or (verdict and "\n" not in text):
+            # Evidence is the rest of the verdict line, or the next non-empty
+            # line when the model puts it below a bare "YES:".
+            rest = text[len(word):].lstrip(": \t")
+            detail = next((line.strip() for line in rest.split("\n") if line.strip()), "")
+            if verdict == "watching":
+                detail = detail[:200]
+            return (verdict, detail or _VERDICT_DEFAULTS[verdict])
 
         # 2. FINAL_JSON structured output
-        import re, json as _json
-        json_match = re.search(r"FINAL_JSON:\s*(\{.*\})", text, re.DOTALL)
+        json_match = _FINAL_JSON_RE.search(text)
         if json_match:
             try:
-                obj = _json.loads(json_match.group(1))
+                obj = json.loads(json_match.group(1))
                 decision = obj.get("decision", "").lower()
                 if decision == "resolved":
                     parts = []
@@ -217,15 +375,13 @@ class WaitEngine:
                     if obj.get("evidence"):
                         parts.append(", ".join(obj["evidence"]))
                     return ("resolved", " — ".join(parts) or "Condition met")
-            except (_json.JSONDecodeError, AttributeError):
+            except (json.JSONDecodeError, AttributeError):
                 pass
 
-        # 3. Multi-line: scan for a YES: line after reasoning
-        for line in text.split("\n"):
-            stripped = line.strip()
-            if stripped.upper().startswith("YES"):
-                detail = stripped[3:].lstrip(": ").strip()
-                return ("resolved", detail or "Condition met")
+        # 3. Multi-line: scan for a YES: line after (brief) reasoning
+        m = _YES_LINE_RE.search(text, 0, _VERDICT_SCAN_CHARS)
+        if m:
+            return ("resolved", m.group(1).strip() or "Condition met")
 
         # Everything else is NO / watching
         detail = text.lstrip("NO").lstrip(": ").strip()
@@ -238,6 +394,7 @@ class WaitEngine:
         job.status = "resolved"
         job.result_message = description
         del self.jobs[job.id]
+        self._release_frame(job)
 
         await self._persist_wait_terminal(job, "resolved", description)
         log.info(f"Job {job.id} RESOLVED: {description}")
@@ -245,10 +402,9 @@ class WaitEngine:
 
         if job.task_id:
             try:
-                screenshot_refs = self._save_last_frame(job, "after")
-                elapsed = time.time() - job.context.started_at
-                from ..task import manager
-                await manager.on_wait_finished(
+                screenshot_refs = await self._save_last_frame(job, "after")
+                elapsed = job.context.elapsed
+                await task_mgr.on_wait_finished(
                     task_id=job.task_id,
                     wait_id=job.id,
                     state="resolved",
@@ -270,6 +426,7 @@ class WaitEngine:
         job.status = "timeout"
         job.result_message = f"Timeout after {job.timeout}s."
         del self.jobs[job.id]
+        self._release_frame(job)
 
         await self._persist_wait_terminal(job, "timeout", job.result_message)
         log.info(f"Job {job.id} TIMEOUT: {job.result_message}")
@@ -277,10 +434,9 @@ class WaitEngine:
 
         if job.task_id:
             try:
-                screenshot_refs = self._save_last_frame(job, "after")
-                elapsed = time.time() - job.context.started_at
-                from ..task import manager
-                await manager.on_wait_finished(
+                screenshot_refs = await self._save_last_frame(job, "after")
+                elapsed = job.context.elapsed
+                await task_mgr.on_wait_finished(
                     task_id=job.task_id,
                     wait_id=job.id,
                     state="timeout",
@@ -295,8 +451,12 @@ class WaitEngine:
             f"[smart_wait timeout] Job {job.id}: {job.criteria} — {job.result_message}"
         )
 
-    def _save_last_frame(self, job: WaitJob, role: str) -> dict | None:
-        """Save the last captured JPEG to disk for task logging."""
+    async def _save_last_frame(self, job: WaitJob, role: str) -> dict | None:
+        """Save the last captured frame to disk for task logging."""
+        if job._last_jpeg is None and job._last_frame is not None:
+            # Cache hits never encoded this frame; keep the encode off the loop.
+            loop = asyncio.get_running_loop()
+            job._last_jpeg = await loop.run_in_executor(None, frame_to_jpeg, job._last_frame)
         if not job._last_jpeg:
             return None
         from ..screenshots import save_screenshot_from_jpeg
@@ -306,14 +466,14 @@ class WaitEngine:
     async def _inject_system_event(self, message: str):
         """Inject a system event into OpenClaw to wake the agent (async subprocess)."""
         try:
-            from .. import config as _cfg
             proc = await asyncio.create_subprocess_exec(
-                _cfg.OPENCLAW_CLI, "system", "event", "--text", message, "--mode", "now",
+                config.OPENCLAW_CLI, "system", "event", "--text", message, "--mode", "now",
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
             )
             try:
-                stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=10)
+                async with asyncio.timeout(10):
+                    stdout, stderr = await proc.communicate()
             except asyncio.TimeoutError:
                 proc.kill()
                 await proc.wait()
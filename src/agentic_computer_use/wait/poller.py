@@ -2,7 +2,13 @@
 from .. import config
 
 
+def _clamp(interval: float) -> float:
+    return max(config.MIN_POLL_INTERVAL, min(interval, config.MAX_POLL_INTERVAL))
+
+
 class AdaptivePoller:
+    __slots__ = ("base", "current", "static_count")
+
     def __init__(self, base_interval: float = None):
         try:
             self.base = float(base_interval) if base_interval is not None else config.DEFAULT_POLL_INTERVAL
@@ -11,11 +17,13 @@ class AdaptivePoller:
         self.current = self.base
         self.static_count = 0
 
-    def on_no_change(self):
-        """Screen hasn't changed (pixel-diff gate skipped)."""
-        self.static_count += 1
-        if self.static_count > 5:
-            self.current = min(self.current * 1.5, config.MAX_POLL_INTERVAL)
+    def on_no_change(self, count: int = 1):
+        """Screen hasn't changed (pixel-diff gate skipped) for *count* polls."""
+        # Every static poll past the fifth backs off by 1.5x — applied in one
+        # step. 64 steps saturate any interval, and keep the power finite.
+        steps = min(64, max(0, self.static_count + count - max(self.static_count, 5)))
+        self.static_count += count
+        self.current = _clamp(self.current * 1.5 ** steps)
 
     def on_change_no_match(self):
         """Screen changed but condition not met."""
@@ -25,7 +33,7 @@ class AdaptivePoller:
     def on_partial(self):
         """Model said PARTIAL — getting close, speed up."""
         self.static_count = 0
-        self.current = max(self.current * 0.5, config.MIN_POLL_INTERVAL)
+        self.current = _clamp(self.current * 0.5)
 
     def on_match(self):
         pass
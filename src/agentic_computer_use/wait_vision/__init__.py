@@ -1,13 +1,20 @@
-"""Pluggable vision backend — re-exports evaluate_condition() and check_health().
+"""Pluggable vision backend — re-exports evaluate_condition(), check_health() and close().
 
 All existing callers (wait/engine.py, daemon.py) work unchanged.
 Backend selected by ACU_VISION_BACKEND env var: ollama|vllm|claude|passthrough
 """
+import time
+
 from .. import config
 from .base import VisionBackend
 
 _backend: VisionBackend | None = None
 
+# Status pages poll health often and the backend's answer rarely changes.
+# Only healthy results are cached, so a backend that just came up is seen at once.
+_HEALTH_TTL = 10.0
+_health_cache: tuple[float, dict] | None = None
+
 
 def _get_backend() -> VisionBackend:
     global _backend
@@ -47,8 +54,20 @@ async def evaluate_condition(
 
 
 async def check_health(model: str = None) -> dict:
-    """Check if the configured vision backend is healthy."""
-    return await _get_backend().check_health()
+    """Check if the configured vision backend is healthy (healthy results cached for _HEALTH_TTL seconds)."""
+    global _health_cache
+    now = time.monotonic()
+    if _health_cache is not None and now - _health_cache[0] < _HEALTH_TTL:
+        return _health_cache[1]
+    result = await _get_backend().check_health()
+    _health_cache = (now, result) if result.get("ok") else None
+    return result
+
+
+async def close() -> None:
+    """Close the active backend's HTTP client, if one was created."""
+    if _backend is not None:
+        await _backend.aclose()
 
 
 # Legacy alias
@@ -44,7 +44,7 @@ class ClaudeBackend(VisionBackend):
         # Build Anthropic messages format
         content = []
         for img in images:
-            b64 = base64.b64encode(img).decode()
+            b64 = base64.b64encode(img).decode("ascii")
             content.append({
                 "type": "image",
                 "source": {"type": "base64", "media_type": "image/jpeg", "data": b64}
@@ -83,3 +83,9 @@ class ClaudeBackend(VisionBackend):
         if not config.CLAUDE_API_KEY:
             return {"ok": False, "backend": "claude", "error": "ANTHROPIC_API_KEY not set"}
         return {"ok": True, "backend": "claude", "model": config.CLAUDE_VISION_MODEL}
+
+    async def aclose(self) -> None:
+        global _client
+        if _client is not None:
+            await _client.aclose()
+            _client = None
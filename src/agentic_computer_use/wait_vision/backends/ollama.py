@@ -15,7 +15,10 @@ _client: httpx.AsyncClient | None = None
 def _get_client() -> httpx.AsyncClient:
     global _client
     if _client is None or _client.is_closed:
-        _client = httpx.AsyncClient(timeout=180.0)
+        _client = httpx.AsyncClient(
+            timeout=180.0,
+            limits=httpx.Limits(max_connections=8, max_keepalive_connections=4),
+        )
     return _client
 
 
@@ -28,7 +31,7 @@ class OllamaBackend(VisionBackend):
         job_id: str = None,
     ) -> str:
         model = model or config.VISION_MODEL
-        encoded_images = [base64.b64encode(img).decode() for img in images]
+        encoded_images = [base64.b64encode(img).decode("ascii") for img in images]
 
         debug.log_vision_request(prompt, len(images), [len(img) for img in images], job_id=job_id)
 
@@ -69,3 +72,9 @@ class OllamaBackend(VisionBackend):
             return {"ok": True, "backend": "ollama", "models": models, "has_model": has_model, "target_model": model}
         except Exception as e:
             return {"ok": False, "backend": "ollama", "error": str(e)}
+
+    async def aclose(self) -> None:
+        global _client
+        if _client is not None:
+            await _client.aclose()
+            _client = None
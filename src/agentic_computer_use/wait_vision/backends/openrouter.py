@@ -46,7 +46,7 @@ class OpenRouterBackend(VisionBackend):
         # Build OpenAI-compatible messages with images
         content = []
         for img in images:
-            b64 = base64.b64encode(img).decode()
+            b64 = base64.b64encode(img).decode("ascii")
             content.append({
                 "type": "image_url",
                 "image_url": {"url": f"data:image/jpeg;base64,{b64}"}
@@ -92,3 +92,9 @@ class OpenRouterBackend(VisionBackend):
             return {"ok": True, "backend": "openrouter", "model": config.OPENROUTER_VISION_MODEL}
         except Exception as e:
             return {"ok": False, "backend": "openrouter", "error": str(e)}
+
+    async def aclose(self) -> None:
+        global _client
+        if _client is not None:
+            await _client.aclose()
+            _client = None
@@ -15,7 +15,10 @@ _client: httpx.AsyncClient | None = None
 def _get_client() -> httpx.AsyncClient:
     global _client
     if _client is None or _client.is_closed:
-        _client = httpx.AsyncClient(timeout=180.0)
+        _client = httpx.AsyncClient(
+            timeout=180.0,
+            limits=httpx.Limits(max_connections=8, max_keepalive_connections=4),
+        )
     return _client
 
 
@@ -33,7 +36,7 @@ class VLLMBackend(VisionBackend):
         # Build OpenAI-compatible messages with images
         content = []
         for img in images:
-            b64 = base64.b64encode(img).decode()
+            b64 = base64.b64encode(img).decode("ascii")
             content.append({
                 "type": "image_url",
                 "image_url": {"url": f"data:image/jpeg;base64,{b64}"}
@@ -70,3 +73,9 @@ class VLLMBackend(VisionBackend):
             return {"ok": True, "backend": "vllm", "models": models, "target_model": config.VLLM_MODEL}
         except Exception as e:
             return {"ok": False, "backend": "vllm", "error": str(e)}
+
+    async def aclose(self) -> None:
+        global _client
+        if _client is not None:
+            await _client.aclose()
+            _client = None
@@ -20,3 +20,6 @@ class VisionBackend(ABC):
     async def check_health(self) -> dict:
         """Check if the backend is healthy and ready."""
         ...
+
+    async def aclose(self) -> None:
+        """Release pooled connections (daemon shutdown). No-op by default."""
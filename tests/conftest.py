@@ -6,8 +6,41 @@ via `humanize_on` fixture.
 """
 from __future__ import annotations
 
+import asyncio
+from types import SimpleNamespace
+
 import pytest
 
+# Async tests are many small awaits around the SQLite worker thread; uvloop's
+# cheaper scheduling helps when it is installed. Optional — not a dev dep.
+try:
+    import uvloop
+except ImportError:
+    pass
+else:
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+
+@pytest.fixture(scope="session")
+def modules():
+    """Core wait/task objects, imported once for the whole session."""
+    from src.agentic_computer_use import db
+    from src.agentic_computer_use.capture.diff import PixelDiffGate
+    from src.agentic_computer_use.task import manager
+    from src.agentic_computer_use.wait.context import JobContext, build_prompt
+    from src.agentic_computer_use.wait.engine import WaitEngine
+    from src.agentic_computer_use.wait.poller import AdaptivePoller
+
+    return SimpleNamespace(
+        db=db,
+        manager=manager,
+        PixelDiffGate=PixelDiffGate,
+        AdaptivePoller=AdaptivePoller,
+        JobContext=JobContext,
+        build_prompt=build_prompt,
+        WaitEngine=WaitEngine,
+    )
+
 
 @pytest.fixture(autouse=True)
 def humanize_off(monkeypatch):
@@ -3,25 +3,33 @@
 Focused on deterministic components (task memory, wait linkage, diff/poller helpers).
 """
 import asyncio
+import contextlib
+import sqlite3
+import uuid
 from datetime import datetime, timedelta, timezone
 
 import pytest
+import pytest_asyncio
 
 
-@pytest.fixture
-def isolated_db(monkeypatch, tmp_path):
-    """Isolate DB per test to avoid cross-test contamination."""
-    from src.agentic_computer_use import config
+@pytest_asyncio.fixture
+async def isolated_db(monkeypatch, tmp_path):
+    """Isolate DB per test to avoid cross-test contamination.
 
-    monkeypatch.setattr(config, "DATA_DIR", tmp_path)
-    monkeypatch.setattr(config, "DB_PATH", tmp_path / "test_data.db")
-    return config.DB_PATH
+    The DB is a named in-memory one, so no .db/-wal/-shm files are written.
+    It lives as long as the shared connection, which closes with the test.
+    """
+    from src.agentic_computer_use import config, db
 
+    monkeypatch.setattr(config, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(config, "DB_PATH", f"file:test-{uuid.uuid4().hex}?mode=memory&cache=shared")
+    db.enable_shared()
+    yield config.DB_PATH
+    await db.close_all()
 
-def test_structured_verdict_parser_prefers_final_json():
-    from src.agentic_computer_use.wait.engine import WaitEngine
 
-    eng = WaitEngine()
+def test_structured_verdict_parser_prefers_final_json(modules):
+    eng = modules.WaitEngine()
     response = """I can see the terminal line indicating success.
 Condition appears satisfied.
 FINAL_JSON: {"decision":"resolved","confidence":0.93,"evidence":["PROCESS_COMPLETE"],"summary":"Completion token is visible"}"""
@@ -32,10 +40,8 @@ FINAL_JSON: {"decision":"resolved","confidence":0.93,"evidence":["PROCESS_COMPLE
     assert "PROCESS_COMPLETE" in detail
 
 
-def test_structured_verdict_parser_falls_back_to_legacy_text():
-    from src.agentic_computer_use.wait.engine import WaitEngine
-
-    eng = WaitEngine()
+def test_structured_verdict_parser_falls_back_to_legacy_text(modules):
+    eng = modules.WaitEngine()
     response = "Reasoning text only\nYES: build output shows success"
 
     verdict, detail = eng._parse_verdict(response)
@@ -43,63 +49,224 @@ def test_structured_verdict_parser_falls_back_to_legacy_text():
     assert "build output shows success" in detail
 
 
-def test_pixel_diff_gate():
-    """Pixel diff should gate identical frames and pass changed frames."""
+@pytest.mark.parametrize("response, expected", [
+    ("YES: dialog is open", ("resolved", "dialog is open")),
+    ("yes", ("resolved", "Condition met")),
+    # A leading YES keeps only its own line as evidence
+    ("YES: build finished\nextra commentary", ("resolved", "build finished")),
+    # Evidence on the line after a bare "YES:" is kept
+    ("YES:\nthe export dialog is open", ("resolved", "the export dialog is open")),
+    ("YES\n\n  toast says Saved", ("resolved", "toast says Saved")),
+    ("NO: spinner still visible", ("watching", "spinner still visible")),
+    # A leading NO on a multi-line reply does not hide a later YES
+    ("NO: not at first\nYES: now it is", ("resolved", "now it is")),
+    # YES lines past the verdict scan window are ignored
+    ("x" * 1100 + "\nYES: too late", ("watching", "x" * 200)),
+])
+def test_verdict_parser_first_word_dispatch(modules, response, expected):
+    assert modules.WaitEngine()._parse_verdict(response) == expected
+
+
+@pytest.mark.parametrize("response, expected", [
+    # Words that merely start with YES are not a verdict
+    ("YESTERDAY's build is still shown", ("watching", "YESTERDAY's build is still shown")),
+    # An echoed answer template never resolves a wait
+    (
+        "YES: <one sentence of visible evidence confirming the condition is met>\n"
+        "NO: <one sentence explaining what is missing or not yet visible>",
+        ("watching", "Empty response"),
+    ),
+    (
+        "YES: <one sentence of visible evidence confirming the condition is met>\n"
+        "NO: progress bar at 40%",
+        ("watching", "progress bar at 40%"),
+    ),
+])
+def test_verdict_parser_ignores_template_echo_and_yes_prefixes(modules, response, expected):
+    assert modules.WaitEngine()._parse_verdict(response) == expected
+
+
+@pytest_asyncio.fixture
+async def fast_engine(monkeypatch, isolated_db):
+    """WaitEngine with a fixed fake frame, stubbed vision and fast timers.
+
+    Returns (engine, replies): append to replies to script the model; each
+    vision call pops the next one (repeating the last).
+    """
+    import numpy as np
+    from src.agentic_computer_use import config
+    from src.agentic_computer_use.wait import engine as engine_mod
+
+    frame = np.zeros((40, 60, 3), dtype=np.uint8)
+    replies = []
+    calls = []
+
+    async def fake_evaluate(prompt, images, job_id=None):
+        calls.append(job_id)
+        return replies.pop(0) if len(replies) > 1 else replies[0]
+
+    async def no_inject(self, message):
+        pass
+
+    monkeypatch.setattr(engine_mod, "evaluate_condition", fake_evaluate)
+    monkeypatch.setattr(engine_mod, "POLL_INTERVAL", 0.05)
+    monkeypatch.setattr(engine_mod.WaitEngine, "_capture", lambda self, job: frame)
+    monkeypatch.setattr(engine_mod.WaitEngine, "_inject_system_event", no_inject)
+    monkeypatch.setattr(config, "MAX_STATIC_SECONDS", 0.3)
+    eng = engine_mod.WaitEngine()
+    eng.vision_calls = calls
+    yield eng, replies
+    await eng.shutdown()
+
+
+def _wait_job(job_id, criteria="dialog open"):
+    from src.agentic_computer_use.wait.engine import WaitJob
+    return WaitJob(id=job_id, target_type="screen", target_id="full", criteria=criteria, timeout=30)
+
+
+@pytest.mark.asyncio
+async def test_wait_engine_resolves_from_cached_verdict(fast_engine):
+    eng, replies = fast_engine
+    replies.append("YES: dialog is open")
+
+    eng.add_job(_wait_job("w1"))
+    await asyncio.sleep(0.2)
+    assert eng.get_job("w1") is None  # resolved by the vision call
+
+    # Same criteria on the same unchanged frame: answered from the cache
+    job = _wait_job("w2")
+    eng.add_job(job)
+    await asyncio.sleep(0.2)
+    assert job.status == "resolved"
+    assert len(eng.vision_calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_wait_engine_verdict_cache_expires_after_max_static(fast_engine):
+    eng, replies = fast_engine
+    replies.append("NO: nothing yet")
+
+    eng.add_job(_wait_job("w1"))
+    await asyncio.sleep(0.2)
+    # Polled every 50ms, but the static frame is only re-asked once cached
+    assert len(eng.vision_calls) == 1
+    await asyncio.sleep(0.3)  # past MAX_STATIC_SECONDS (0.3s)
+    assert len(eng.vision_calls) == 2
+    eng.cancel_job("w1")
+
+
+@pytest.mark.asyncio
+async def test_wait_engine_cancel_stops_timer(fast_engine):
+    eng, replies = fast_engine
+    replies.append("NO: nothing yet")
+
+    job = _wait_job("w1")
+    eng.add_job(job)
+    await asyncio.sleep(0.1)
+    eng.cancel_job("w1")
+    assert job.status == "cancelled"
+    assert job._handle is None
+
+    polled = job.next_check_at
+    await asyncio.sleep(0.5)  # would cross the cache expiry if still running
+    assert job.next_check_at == polled
+    assert len(eng.vision_calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_wait_engine_shutdown_disarms_jobs(fast_engine):
+    eng, replies = fast_engine
+    replies.append("NO: nothing yet")
+
+    job = _wait_job("w1")
+    eng.add_job(job)
+    await asyncio.sleep(0.1)
+    await eng.shutdown()
+    assert job._handle is None
+    assert not eng._ticks
+
+    calls = len(eng.vision_calls)
+    eng.reschedule("w1")  # a late wait_update must not restart polling
+    await asyncio.sleep(0.4)
+    assert len(eng.vision_calls) == calls
+
+
+@pytest.fixture(scope="module")
+def diff_frames():
+    """Base frame, an identical copy, and a 16%-changed frame. Read-only."""
     import numpy as np
-    from src.agentic_computer_use.capture.diff import PixelDiffGate
 
-    gate = PixelDiffGate()
     frame1 = np.zeros((100, 100, 3), dtype=np.uint8)
     frame2 = frame1.copy()
     frame3 = frame1.copy()
     frame3[10:50, 10:50] = 255  # 16% change
+    for f in (frame1, frame2, frame3):
+        f.setflags(write=False)
+    return frame1, frame2, frame3
+
+
+def test_pixel_diff_gate(modules, diff_frames):
+    """Pixel diff should gate identical frames and pass changed frames."""
+    gate = modules.PixelDiffGate()
+    frame1, frame2, frame3 = diff_frames
 
     assert gate.should_evaluate(frame1) is True   # first frame always
     assert gate.should_evaluate(frame2) is False  # identical
     assert gate.should_evaluate(frame3) is True   # changed
 
 
-def test_adaptive_poller():
+def test_adaptive_poller(modules):
     """Poller should speed up on partial and slow down on static."""
-    from src.agentic_computer_use.wait.poller import AdaptivePoller
-
-    p = AdaptivePoller(base_interval=2.0)
+    p = modules.AdaptivePoller(base_interval=2.0)
     assert p.interval == 2.0
 
     p.on_partial()
     assert p.interval < 2.0
 
-    p2 = AdaptivePoller(base_interval=2.0)
-    for _ in range(10):
-        p2.on_no_change()
+    p2 = modules.AdaptivePoller(base_interval=2.0)
+    p2.on_no_change(10)
     assert p2.interval > 2.0
 
+    # A long static stretch saturates at the max instead of overflowing
+    from src.agentic_computer_use import config
+    p3 = modules.AdaptivePoller(base_interval=2.0)
+    p3.on_no_change(5000)
+    assert p3.interval == config.MAX_POLL_INTERVAL
+
+
+# Fixed prompt inputs, so the rendered prompt can be asserted exactly.
+_CRITERIA = "A cat appears on screen"
+_ELAPSED = 15.0
 
-def test_job_context_and_build_prompt():
+
+def test_job_context_and_build_prompt(modules):
     """JobContext tracks start time; build_prompt generates valid YES/NO prompt."""
     import time
-    from src.agentic_computer_use.wait.context import JobContext, build_prompt
 
-    ctx = JobContext()
-    assert ctx.started_at <= time.time()
+    ctx = modules.JobContext()
+    assert ctx.started_at <= time.monotonic()
+    assert ctx.elapsed >= 0
 
-    prompt = build_prompt("A cat appears on screen", elapsed=15.0)
-    assert "A cat appears on screen" in prompt
+    prompt = modules.build_prompt(_CRITERIA, elapsed=_ELAPSED)
+    assert f"CONDITION: {_CRITERIA}" in prompt
+    assert "Time elapsed waiting: 15s" in prompt
     assert "YES" in prompt
     assert "NO" in prompt
 
 
 @pytest.mark.asyncio
-async def test_task_lifecycle_and_query(isolated_db):
+async def test_task_lifecycle_and_query(isolated_db, modules):
     """Tasks should support register → update → query → complete."""
-    from src.agentic_computer_use.task import manager
+    manager = modules.manager
 
     result = await manager.register_task("Deploy", ["build", "test", "deploy"])
     tid = result["task_id"]
     assert result["status"] == "active"
 
-    await manager.update_task(tid, message="Build started")
-    await manager.update_plan_item(tid, ordinal=0, status="completed")
+    # Independent of each other; the shared connection serializes them.
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(manager.update_task(tid, message="Build started"))
+        tg.create_task(manager.update_plan_item(tid, ordinal=0, status="completed"))
 
     summary = await manager.get_task_summary(tid)
     assert summary["items"][0]["status"] == "completed"
@@ -110,8 +277,8 @@ async def test_task_lifecycle_and_query(isolated_db):
 
 
 @pytest.mark.asyncio
-async def test_status_alias_canceled_normalizes_to_cancelled(isolated_db):
-    from src.agentic_computer_use.task import manager
+async def test_status_alias_canceled_normalizes_to_cancelled(isolated_db, modules):
+    manager = modules.manager
 
     task = await manager.register_task("Alias status", ["step1"])
     tid = task["task_id"]
@@ -121,9 +288,9 @@ async def test_status_alias_canceled_normalizes_to_cancelled(isolated_db):
 
 
 @pytest.mark.asyncio
-async def test_hierarchical_task_model(isolated_db):
+async def test_hierarchical_task_model(isolated_db, modules):
     """Test the full hierarchy: task → plan items → actions → logs."""
-    from src.agentic_computer_use.task import manager
+    manager = modules.manager
 
     # Register
     result = await manager.register_task("Video Export", ["Import clip", "Apply color grade", "Export"])
@@ -132,32 +299,83 @@ async def test_hierarchical_task_model(isolated_db):
     # Update plan items
     await manager.update_plan_item(tid, ordinal=0, status="active")
     await manager.log_action(tid, "cli", "ffmpeg -i clip.mp4 timeline.mlt", status="completed")
-    await manager.update_plan_item(tid, ordinal=0, status="completed")
 
-    await manager.update_plan_item(tid, ordinal=1, status="active")
+    # Close item 0 and open item 1 in one transaction
+    await manager.update_plan_items(tid, [(0, "completed"), (1, "active")])
     await manager.log_action(tid, "gui", "Applied LUT via DaVinci Resolve", status="completed")
 
-    # Get summary at item level
-    summary = await manager.get_task_summary(tid, detail_level="items")
+    # The writes above depend on each other (actions attach to the active
+    # item); the reads below don't, so issue them together.
+    async with asyncio.TaskGroup() as tg:
+        summary_t = tg.create_task(manager.get_task_summary(tid, detail_level="items"))
+        detail_t = tg.create_task(manager.get_task_detail(tid, ordinal=0))
+        full_t = tg.create_task(manager.get_task_summary(tid, detail_level="actions"))
+
+    # Summary at item level
+    summary = summary_t.result()
     assert len(summary["items"]) == 3
     assert summary["items"][0]["status"] == "completed"
     assert summary["items"][1]["status"] == "active"
     assert summary["items"][2]["status"] == "pending"
 
     # Drill down into item 0
-    detail = await manager.get_task_detail(tid, ordinal=0)
+    detail = detail_t.result()
     assert detail["title"] == "Import clip"
     assert len(detail["actions"]) >= 1
 
-    # Get full detail
-    full = await manager.get_task_summary(tid, detail_level="actions")
+    # Full detail
+    full = full_t.result()
     assert "actions" in full["items"][0]
 
 
 @pytest.mark.asyncio
-async def test_stuck_detection_respects_active_wait_and_emits_resume_packet(isolated_db):
-    from src.agentic_computer_use import db
-    from src.agentic_computer_use.task import manager
+async def test_update_plan_items_is_all_or_nothing_and_composes(isolated_db, modules):
+    db, manager = modules.db, modules.manager
+
+    tid = (await manager.register_task("Batch", ["a", "b"]))["task_id"]
+
+    async def snapshot():
+        async with db.shared_db() as conn:
+            items = await conn.execute_fetchall(
+                "SELECT ordinal, status, started_at, completed_at, duration_seconds FROM plan_items WHERE task_id = ? ORDER BY ordinal",
+                (tid,),
+            )
+            task = await conn.execute_fetchall("SELECT updated_at FROM tasks WHERE id = ?", (tid,))
+            msgs = await conn.execute_fetchall("SELECT COUNT(*) FROM task_messages WHERE task_id = ?", (tid,))
+        return [tuple(r) for r in items], task[0][0], msgs[0][0]
+
+    before = await snapshot()
+
+    # Any bad entry rejects the whole batch, including the valid change before it
+    res = await manager.update_plan_items(tid, [(0, "active"), (7, "completed")])
+    assert "error" in res
+    res = await manager.update_plan_items(tid, [(0, "active"), (1, "bogus")])
+    assert "error" in res
+    # An empty batch is a no-op
+    await manager.update_plan_items(tid, [])
+    assert await snapshot() == before
+
+    # Changes to the same item compose in order: started, then completed
+    await manager.update_plan_items(tid, [(0, "active"), (0, "completed"), (1, "active")])
+    items, _, msg_count = await snapshot()
+    ordinal, status, started_at, completed_at, duration = items[0]
+    assert status == "completed"
+    assert started_at and completed_at
+    assert duration is not None and duration >= 0
+    assert items[1][1] == "active" and items[1][2]
+    assert msg_count == before[2] + 3
+
+
+def _raw_sql(db_path, *statements):
+    """Apply test setup SQL in one transaction on a plain sqlite3 connection."""
+    with contextlib.closing(sqlite3.connect(db_path, uri=True)) as raw, raw:
+        for sql, params in statements:
+            raw.execute(sql, params)
+
+
+@pytest.mark.asyncio
+async def test_stuck_detection_respects_active_wait_and_emits_resume_packet(isolated_db, modules):
+    manager = modules.manager
 
     task = await manager.register_task("Long task", ["step1", "step2"])
     tid = task["task_id"]
@@ -165,25 +383,19 @@ async def test_stuck_detection_respects_active_wait_and_emits_resume_packet(isol
     # Link active wait
     await manager.on_wait_created(tid, "wait123", "window:app", "process completes")
 
-    # Mirror real runtime: wait_jobs has an active watching row
-    conn = await db.get_db()
-    try:
-        await conn.execute(
+    # Mirror real runtime (wait_jobs has an active watching row) and
+    # artificially age the task, in one transaction
+    now = datetime.now(timezone.utc)
+    now_ts = now.isoformat()
+    old_ts = (now - timedelta(seconds=manager.STUCK_THRESHOLD_SECONDS + 30)).isoformat()
+    _raw_sql(
+        isolated_db,
+        (
             "INSERT INTO wait_jobs (id, task_id, target_type, target_id, criteria, timeout_seconds, poll_interval, status, created_at) VALUES (?,?,?,?,?,?,?,?,?)",
-            ("wait123", tid, "window", "app", "process completes", 300, 2.0, "watching", datetime.now(timezone.utc).isoformat()),
-        )
-        await conn.commit()
-    finally:
-        await conn.close()
-
-    # Artificially age the task
-    old_ts = (datetime.now(timezone.utc) - timedelta(seconds=manager.STUCK_THRESHOLD_SECONDS + 30)).isoformat()
-    conn = await db.get_db()
-    try:
-        await conn.execute("UPDATE tasks SET updated_at = ? WHERE id = ?", (old_ts, tid))
-        await conn.commit()
-    finally:
-        await conn.close()
+            ("wait123", tid, "window", "app", "process completes", 300, 2.0, "watching", now_ts),
+        ),
+        ("UPDATE tasks SET updated_at = ? WHERE id = ?", (old_ts, tid)),
+    )
 
     # Should NOT alert while active wait exists
     alerts = await manager.check_stuck_tasks()
@@ -191,13 +403,11 @@ async def test_stuck_detection_respects_active_wait_and_emits_resume_packet(isol
 
     # Finish wait, then age again
     await manager.on_wait_finished(tid, "wait123", "resolved", "done")
-    conn = await db.get_db()
-    try:
-        await conn.execute("UPDATE wait_jobs SET status = 'resolved', resolved_at = ? WHERE id = ?", (datetime.now(timezone.utc).isoformat(), "wait123"))
-        await conn.execute("UPDATE tasks SET updated_at = ? WHERE id = ?", (old_ts, tid))
-        await conn.commit()
-    finally:
-        await conn.close()
+    _raw_sql(
+        isolated_db,
+        ("UPDATE wait_jobs SET status = 'resolved', resolved_at = ? WHERE id = ?", (now_ts, "wait123")),
+        ("UPDATE tasks SET updated_at = ? WHERE id = ?", (old_ts, tid)),
+    )
 
     alerts = await manager.check_stuck_tasks()
     assert len(alerts) == 1